@@ -0,0 +1,69 @@
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.db import DEFAULT_DB_ALIAS
+from django.utils.translation import gettext_lazy as _
+from rest_framework import exceptions
+from rest_framework.authentication import TokenAuthentication
+from rest_framework.authtoken.models import Token
+
+from .cache import is_cache_shared
+
+User = get_user_model()
+
+CACHE_KEY = 'auth_token:{}'
+CACHED_FIELDS = [
+    field
+    for field in User._meta.concrete_fields
+    if field.attname not in ('password', *User.counter_fields)
+]
+CACHED_FIELD_NAMES = [field.attname for field in CACHED_FIELDS]
+
+
+def get_cached_values(user):
+    return [
+        field.get_prep_value(getattr(user, field.attname))
+        for field in CACHED_FIELDS
+    ]
+
+
+def get_cached_user(values):
+    return User.from_db(DEFAULT_DB_ALIAS, CACHED_FIELD_NAMES, values)
+
+
+def invalidate_token(key):
+    cache.delete(CACHE_KEY.format(key))
+
+
+def invalidate_user_tokens(user_id):
+    cache.delete_many(
+        [
+            CACHE_KEY.format(key)
+            for key in Token.objects.filter(user_id=user_id).values_list(
+                'key',
+                flat=True,
+            )
+        ],
+    )
+
+
+class CachedTokenAuthentication(TokenAuthentication):
+    def authenticate_credentials(self, key):
+        if not is_cache_shared():
+            return super().authenticate_credentials(key)
+        cache_key = CACHE_KEY.format(key)
+        values = cache.get(cache_key)
+        if values is None:
+            user, token = super().authenticate_credentials(key)
+            cache.set(
+                cache_key,
+                get_cached_values(user),
+                settings.AUTH_TOKEN_CACHE_TIMEOUT,
+            )
+            return user, token
+        user = get_cached_user(values)
+        if not user.is_active:
+            raise exceptions.AuthenticationFailed(
+                _('User inactive or deleted.'),
+            )
+        return user, Token(key=key, user=user)
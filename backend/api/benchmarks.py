@@ -0,0 +1,120 @@
+import json
+import platform
+import subprocess
+import time
+
+import django
+from django.conf import settings
+from django.core.management.base import CommandError
+from django.db import connection
+
+from .request_stats import RequestStats, percentile
+
+PERCENTILES = (('p50', 0.5), ('p95', 0.95), ('p99', 0.99))
+
+
+def get_commit():
+    try:
+        return subprocess.run(
+            ('git', 'rev-parse', '--short', 'HEAD'),
+            capture_output=True,
+            check=True,
+            cwd=settings.BASE_DIR,
+            text=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def get_meta(options, **extra):
+    return {
+        'commit': get_commit(),
+        'seed': options.get('seed'),
+        'iterations': options['iterations'],
+        'warmup': options['warmup'],
+        'python': platform.python_version(),
+        'django': django.get_version(),
+        'database': connection.vendor,
+        **extra,
+    }
+
+
+def summarize(timings, queries, sql_times, statuses=None):
+    summary = {
+        'requests': len(timings),
+        'latency_ms': {
+            **{
+                name: round(percentile(timings, fraction) * 1000, 3)
+                for name, fraction in PERCENTILES
+            },
+            'mean': round(sum(timings) / len(timings) * 1000, 3),
+            'max': round(max(timings) * 1000, 3),
+        },
+        'queries': {
+            **{
+                name: percentile(queries, fraction)
+                for name, fraction in PERCENTILES
+            },
+            'max': max(queries),
+        },
+        'sql_ms': {
+            name: round(percentile(sql_times, fraction) * 1000, 3)
+            for name, fraction in PERCENTILES
+        },
+    }
+    if statuses is not None:
+        summary['statuses'] = sorted(statuses)
+    return summary
+
+
+def measure(client, build, iterations, warmup, reset=None):
+    timings = []
+    queries = []
+    sql_times = []
+    statuses = set()
+    for iteration in range(warmup + iterations):
+        path, params = build()
+        if reset is not None:
+            reset()
+        stats = RequestStats()
+        with connection.execute_wrapper(stats):
+            start = time.perf_counter()
+            response = client.get(path, params)
+            if response.streaming:
+                b''.join(response.streaming_content)
+            elapsed = time.perf_counter() - start
+        if response.status_code >= 400:
+            raise CommandError(f'{path} вернул {response.status_code}')
+        if iteration < warmup:
+            continue
+        timings.append(elapsed)
+        queries.append(stats.queries)
+        sql_times.append(stats.sql_time)
+        statuses.add(response.status_code)
+    return summarize(timings, queries, sql_times, statuses)
+
+
+def measure_calls(call, iterations, warmup):
+    timings = []
+    queries = []
+    sql_times = []
+    for iteration in range(warmup + iterations):
+        stats = RequestStats()
+        with connection.execute_wrapper(stats):
+            start = time.perf_counter()
+            call()
+            elapsed = time.perf_counter() - start
+        if iteration < warmup:
+            continue
+        timings.append(elapsed)
+        queries.append(stats.queries)
+        sql_times.append(stats.sql_time)
+    return summarize(timings, queries, sql_times)
+
+
+def write_report(command, report, output):
+    text = json.dumps(report, ensure_ascii=False, indent=2)
+    if output:
+        output.write_text(text + '\n', encoding='utf-8')
+    else:
+        command.stdout.write(text)
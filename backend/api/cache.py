@@ -0,0 +1,97 @@
+import hashlib
+import time
+
+from django.conf import settings
+from django.core.cache import cache, caches
+from django.core.cache.backends.locmem import LocMemCache
+from django.utils.cache import patch_cache_control
+from django.utils.http import parse_etags
+from rest_framework import status
+from rest_framework.response import Response
+
+VERSION_KEY = 'version:{}'
+RESPONSE_KEY = 'response:{}'
+
+
+def get_version(group):
+    key = VERSION_KEY.format(group)
+    version = cache.get(key)
+    if version is None:
+        version = time.time_ns()
+        if not cache.add(key, version, None):
+            version = cache.get(key, version)
+    return version
+
+
+def is_cache_shared():
+    return not isinstance(caches['default'], LocMemCache)
+
+
+def bump_version(*groups):
+    for group in groups:
+        try:
+            cache.incr(VERSION_KEY.format(group))
+        except ValueError:
+            get_version(group)
+
+
+class VersionedCacheMixin:
+    cache_group = None
+    cached_actions = ('list', 'retrieve')
+    cache_per_user = False
+
+    def get_cache_versions(self, request):
+        versions = [self.cache_group, get_version(self.cache_group)]
+        if self.cache_per_user and request.user.is_authenticated:
+            group = f'user:{request.user.id}'
+            versions += [group, get_version(group)]
+        return versions
+
+    def get_etag(self, request):
+        url = hashlib.md5(
+            request.build_absolute_uri().encode(),
+            usedforsecurity=False,
+        ).hexdigest()[:16]
+        versions = '-'.join(map(str, self.get_cache_versions(request)))
+        return f'"{versions}-{url}"'
+
+    def get_cache_control(self):
+        if self.cache_per_user:
+            return {'private': True, 'no_cache': True}
+        return {'public': True, 'max_age': settings.API_CACHE_MAX_AGE}
+
+    def finalize_cached_response(self, response, etag):
+        response['ETag'] = etag
+        patch_cache_control(response, **self.get_cache_control())
+        return response
+
+    def get_cached_response(self, handler, request, *args, **kwargs):
+        etag = self.get_etag(request)
+        if etag in parse_etags(request.META.get('HTTP_IF_NONE_MATCH', '')):
+            return self.finalize_cached_response(
+                Response(status=status.HTTP_304_NOT_MODIFIED),
+                etag,
+            )
+        key = RESPONSE_KEY.format(etag)
+        data = cache.get(key)
+        if data is not None:
+            return self.finalize_cached_response(Response(data), etag)
+        response = handler(request, *args, **kwargs)
+        if response.status_code != status.HTTP_200_OK:
+            return response
+        cache.set(key, response.data, settings.API_CACHE_TIMEOUT)
+        return self.finalize_cached_response(response, etag)
+
+    def list(self, request, *args, **kwargs):
+        if 'list' not in self.cached_actions:
+            return super().list(request, *args, **kwargs)
+        return self.get_cached_response(
+            super().list, request, *args, **kwargs,
+        )
+
+    def retrieve(self, request, *args, **kwargs):
+        if 'retrieve' not in self.cached_actions:
+            return super().retrieve(request, *args, **kwargs)
+        return self.get_cached_response(
+            super().retrieve, request, *args, **kwargs,
+        )
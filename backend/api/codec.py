@@ -0,0 +1,49 @@
+ALPHABET = '0123456789ABCDEFGHIJKLMNOPQRSTUVWXYZabcdefghijklmnopqrstuvwxyz-_'
+BASE = len(ALPHABET)
+CHECK_SEPARATOR = '.'
+MAX_VALUE = 2 ** 63 - 1
+
+DIGITS = {char: digit for digit, char in enumerate(ALPHABET)}
+
+
+def get_check_char(code):
+    total = 0
+    for position, char in enumerate(code):
+        total += (2 * position + 1) * DIGITS[char]
+    return ALPHABET[total % BASE]
+
+
+def encode(number, checksum=False):
+    if not 0 <= number <= MAX_VALUE:
+        raise ValueError(number)
+    chars = []
+    while True:
+        number, digit = divmod(number, BASE)
+        chars.append(ALPHABET[digit])
+        if not number:
+            break
+    code = ''.join(reversed(chars))
+    if checksum:
+        return code + CHECK_SEPARATOR + get_check_char(code)
+    return code
+
+
+def encode_many(numbers, checksum=False):
+    return [encode(number, checksum) for number in numbers]
+
+
+def decode(code):
+    payload, separator, check = code.partition(CHECK_SEPARATOR)
+    if not payload:
+        raise ValueError(code)
+    number = 0
+    for char in payload:
+        digit = DIGITS.get(char)
+        if digit is None:
+            raise ValueError(code)
+        number = number * BASE + digit
+    if number > MAX_VALUE:
+        raise ValueError(code)
+    if separator and check != get_check_char(payload):
+        raise ValueError(code)
+    return number
@@ -1,13 +1,94 @@
 import base64
+import binascii
+import re
+from io import BytesIO
 
-from django.core.files.base import ContentFile
+from django.conf import settings
+from django.core.files.uploadedfile import (
+    InMemoryUploadedFile,
+    TemporaryUploadedFile,
+)
 from rest_framework.serializers import ImageField
 
+BASE64_MARKER = ';base64,'
+BASE64_CHUNK_SIZE = 64 * 1024
+HEADER_SIZE = 16
+NON_BASE64 = re.compile(r'[^A-Za-z0-9+/=]+')
+
+
+def get_image_extension(header):
+    if header.startswith(b'\x89PNG\r\n\x1a\n'):
+        return 'png'
+    if header.startswith(b'\xff\xd8\xff'):
+        return 'jpeg'
+    if header.startswith((b'GIF87a', b'GIF89a')):
+        return 'gif'
+    if header.startswith(b'RIFF') and header[8:12] == b'WEBP':
+        return 'webp'
+    return None
+
+
+def iter_base64_chunks(data, start, size=BASE64_CHUNK_SIZE):
+    leftover = ''
+    for offset in range(start, len(data), size):
+        chunk = leftover + NON_BASE64.sub('', data[offset:offset + size])
+        end = len(chunk) // 4 * 4
+        leftover = chunk[end:]
+        if end:
+            yield base64.b64decode(chunk[:end])
+    if leftover:
+        yield base64.b64decode(leftover)
+
 
 class Base64ImageField(ImageField):
+    default_error_messages = {
+        'too_large': (
+            'Размер изображения не должен превышать {max_size} байт.'
+        ),
+    }
+
     def to_internal_value(self, data):
         if isinstance(data, str) and data.startswith('data:image'):
-            format, imgstr = data.split(';base64,')
-            ext = format.split('/')[-1]
-            data = ContentFile(base64.b64decode(imgstr), name='image.' + ext)
+            data = self.decode(data)
+        elif getattr(data, 'size', 0) > settings.IMAGE_UPLOAD_MAX_SIZE:
+            self.fail('too_large', max_size=settings.IMAGE_UPLOAD_MAX_SIZE)
         return super().to_internal_value(data)
+
+    def decode(self, data):
+        start = data.find(BASE64_MARKER)
+        if start == -1:
+            self.fail('invalid_image')
+        start += len(BASE64_MARKER)
+        max_size = settings.IMAGE_UPLOAD_MAX_SIZE
+        chunks = iter_base64_chunks(data, start)
+        try:
+            first = next(chunks, b'')
+        except binascii.Error:
+            self.fail('invalid_image')
+        extension = get_image_extension(first[:HEADER_SIZE])
+        if extension is None:
+            self.fail('invalid_image')
+        name = f'image.{extension}'
+        content_type = f'image/{extension}'
+        size = (len(data) - start) // 4 * 3
+        if size > settings.FILE_UPLOAD_MAX_MEMORY_SIZE:
+            file = TemporaryUploadedFile(name, content_type, size, None)
+        else:
+            file = InMemoryUploadedFile(
+                BytesIO(), None, name, content_type, size, None,
+            )
+        try:
+            file.write(first)
+            for chunk in chunks:
+                if file.tell() > max_size:
+                    break
+                file.write(chunk)
+        except binascii.Error:
+            file.close()
+            self.fail('invalid_image')
+        if file.tell() > max_size:
+            file.close()
+            self.fail('too_large', max_size=max_size)
+        file.size = file.tell()
+        file.seek(0)
+        return file
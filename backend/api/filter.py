@@ -1,7 +1,22 @@
 import django_filters
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models import Exists, OuterRef
 from rest_framework.filters import BaseFilterBackend
 
-from recipes.models import Ingredient
+from recipes.models import Favorite, Ingredient, ShoppingCart, Tag, TagInRecipe
+from .cache import get_version
+
+TAG_IDS_CACHE_KEY = 'tag_ids_by_slug:{}'
+
+
+def get_tag_ids(slugs):
+    key = TAG_IDS_CACHE_KEY.format(get_version('tags'))
+    tag_ids = cache.get(key)
+    if tag_ids is None:
+        tag_ids = dict(Tag.objects.values_list('slug', 'id'))
+        cache.add(key, tag_ids, settings.TAG_IDS_CACHE_TIMEOUT)
+    return [tag_ids[slug] for slug in slugs if slug in tag_ids]
 
 
 class RecipeFilterBackend(BaseFilterBackend):
@@ -11,11 +26,46 @@ class RecipeFilterBackend(BaseFilterBackend):
         is_favorited = request.query_params.get('is_favorited')
         customer = request.user
         if tags_slugs:
-            queryset = queryset.filter(tags__slug__in=tags_slugs).distinct()
+            tag_ids = get_tag_ids(tags_slugs)
+            if not tag_ids:
+                return queryset.none()
+            queryset = queryset.filter(
+                Exists(
+                    TagInRecipe.objects.filter(
+                        tag_id__in=tag_ids,
+                        recipe=OuterRef('pk'),
+                    ),
+                ),
+            )
         if is_in_shopping_cart == '1' and customer.is_authenticated:
-            queryset = queryset.filter(shopping_carts__customer=customer)
+            queryset = queryset.filter(
+                Exists(
+                    ShoppingCart.objects.filter(
+                        customer=customer,
+                        recipe=OuterRef('pk'),
+                    ),
+                ),
+            )
         if is_favorited == '1' and customer.is_authenticated:
-            queryset = queryset.filter(favorites__customer=customer)
+            queryset = queryset.filter(
+                Exists(
+                    Favorite.objects.filter(
+                        customer=customer,
+                        recipe=OuterRef('pk'),
+                    ),
+                ),
+            )
+        return queryset
+
+
+class RecipeSearchFilterBackend(BaseFilterBackend):
+    def filter_queryset(self, request, queryset, view):
+        text = request.query_params.get('search')
+        if not text:
+            return queryset
+        queryset = queryset.search(text)
+        if 'ordering' not in request.query_params:
+            queryset = queryset.order_by('-rank', '-similarity', '-id')
         return queryset
 
 
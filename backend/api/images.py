@@ -0,0 +1,79 @@
+import logging
+from concurrent.futures import ThreadPoolExecutor
+from io import BytesIO
+
+from django.conf import settings
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from django.db import transaction
+from PIL import Image, ImageOps
+
+logger = logging.getLogger(__name__)
+
+executor = ThreadPoolExecutor(
+    max_workers=settings.IMAGE_RENDITION_WORKERS,
+    thread_name_prefix='image-renditions',
+)
+
+
+def get_rendition_name(name, rendition):
+    extension = settings.IMAGE_RENDITION_FORMAT.lower()
+    return f'{name}.{rendition}.{extension}'
+
+
+def get_rendition_urls(image, request=None):
+    if not image:
+        return None
+    urls = {}
+    for rendition in settings.IMAGE_RENDITIONS:
+        url = default_storage.url(get_rendition_name(image.name, rendition))
+        urls[rendition] = request.build_absolute_uri(url) if request else url
+    return urls
+
+
+def generate_renditions(name):
+    names = {
+        rendition: get_rendition_name(name, rendition)
+        for rendition in settings.IMAGE_RENDITIONS
+    }
+    missing = {
+        rendition: target
+        for rendition, target in names.items()
+        if not default_storage.exists(target)
+    }
+    if not missing:
+        return 0
+    with default_storage.open(name) as file:
+        with Image.open(file) as original:
+            image = ImageOps.exif_transpose(original)
+            image.load()
+    image_format = settings.IMAGE_RENDITION_FORMAT
+    mode = 'RGB' if image_format == 'JPEG' else 'RGBA'
+    if image.mode != mode:
+        image = image.convert(mode)
+    for rendition, target in missing.items():
+        resized = image.copy()
+        resized.thumbnail(settings.IMAGE_RENDITIONS[rendition], Image.LANCZOS)
+        buffer = BytesIO()
+        resized.save(
+            buffer,
+            format=image_format,
+            quality=settings.IMAGE_RENDITION_QUALITY,
+        )
+        default_storage.save(target, ContentFile(buffer.getvalue()))
+    return len(missing)
+
+
+def generate_renditions_safely(name):
+    try:
+        return generate_renditions(name)
+    except Exception:
+        logger.exception('Не удалось создать превью для %s', name)
+
+
+def schedule_renditions(image):
+    if image:
+        name = image.name
+        transaction.on_commit(
+            lambda: executor.submit(generate_renditions_safely, name),
+        )
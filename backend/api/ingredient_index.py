@@ -0,0 +1,127 @@
+import re
+import threading
+import time
+from array import array
+from bisect import bisect_left
+from collections import namedtuple
+
+from django.conf import settings
+
+from recipes.catalog import bump_catalog_version, get_catalog_version
+from recipes.models import Ingredient
+
+SOURCE = 'ingredients'
+WORD_SEPARATOR = re.compile(r'[\s,.()\-]+')
+
+
+Snapshot = namedtuple(
+    'Snapshot',
+    (
+        'version',
+        'ids',
+        'names',
+        'units',
+        'keys',
+        'word_keys',
+        'word_positions',
+    ),
+)
+
+
+def get_item(snapshot, position):
+    return {
+        'id': snapshot.ids[position],
+        'name': snapshot.names[position],
+        'measurement_unit': snapshot.units[position],
+    }
+
+
+class IngredientIndex:
+    __slots__ = ('lock', 'version', 'checked', 'snapshot')
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        self.version = None
+        self.checked = None
+        self.snapshot = None
+
+    def invalidate(self):
+        bump_catalog_version(SOURCE)
+        self.checked = None
+
+    def get_version(self):
+        now = time.monotonic()
+        if (
+            self.checked is None
+            or now - self.checked >= settings.INGREDIENT_INDEX_CHECK_INTERVAL
+        ):
+            self.version = get_catalog_version(SOURCE)
+            self.checked = now
+        return self.version
+
+    def build(self, version):
+        rows = sorted(
+            Ingredient.objects.values_list('name', 'measurement_unit', 'id'),
+            key=lambda row: (row[0].lower(), row[2]),
+        )
+        words = []
+        for position, (name, _, _) in enumerate(rows):
+            for word in WORD_SEPARATOR.split(name.lower())[1:]:
+                if word:
+                    words.append((word, position))
+        words.sort()
+        names = tuple(row[0] for row in rows)
+        return Snapshot(
+            version=version,
+            ids=array('q', (row[2] for row in rows)),
+            names=names,
+            units=tuple(row[1] for row in rows),
+            keys=tuple(name.lower() for name in names),
+            word_keys=tuple(word for word, _ in words),
+            word_positions=array('l', (position for _, position in words)),
+        )
+
+    def get_snapshot(self):
+        version = self.get_version()
+        snapshot = self.snapshot
+        if snapshot is None or snapshot.version != version:
+            with self.lock:
+                snapshot = self.snapshot
+                if snapshot is None or snapshot.version != version:
+                    snapshot = self.build(version)
+                    self.snapshot = snapshot
+        return snapshot
+
+    def search(self, prefix, limit=None):
+        snapshot = self.get_snapshot()
+        if not prefix:
+            return [
+                get_item(snapshot, position)
+                for position in range(len(snapshot.ids))[:limit]
+            ]
+        key = prefix.lower()
+        keys = snapshot.keys
+        positions = []
+        for position in range(bisect_left(keys, key), len(keys)):
+            if len(positions) == limit or not keys[position].startswith(key):
+                break
+            positions.append(position)
+        seen = set(positions)
+        word_keys = snapshot.word_keys
+        for index in range(bisect_left(word_keys, key), len(word_keys)):
+            if (
+                len(positions) == limit
+                or not word_keys[index].startswith(key)
+            ):
+                break
+            position = snapshot.word_positions[index]
+            if position not in seen:
+                seen.add(position)
+                positions.append(position)
+        return [get_item(snapshot, position) for position in positions]
+
+
+ingredient_index = IngredientIndex()
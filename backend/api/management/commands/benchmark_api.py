@@ -0,0 +1,186 @@
+import random
+from pathlib import Path
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.core.management.base import BaseCommand, CommandError
+from django.db.models import Count
+from django.db.models.functions import Least
+from django.test.utils import setup_test_environment
+from django.urls import reverse
+from rest_framework.authtoken.models import Token
+from rest_framework.test import APIClient
+
+from api import shortlinks
+from api.benchmarks import get_meta, measure, write_report
+from api.ingredient_index import ingredient_index
+from recipes.dataset import USERNAME_PREFIX
+from recipes.models import Ingredient, Recipe, Tag
+
+User = get_user_model()
+
+PAGE_SIZE = 6
+MAX_PAGE = 10
+
+
+def get_recipe_list(**params):
+    return reverse('recipe-list'), {'limit': PAGE_SIZE, **params}
+
+
+ENDPOINTS = {
+    'recipe_list': lambda fixtures, rng: get_recipe_list(
+        page=rng.randint(1, fixtures['pages']),
+    ),
+    'recipe_list_tags': lambda fixtures, rng: get_recipe_list(
+        tags=rng.sample(fixtures['tags'], min(2, len(fixtures['tags']))),
+    ),
+    'recipe_list_author': lambda fixtures, rng: get_recipe_list(
+        author=rng.choice(fixtures['authors']),
+    ),
+    'recipe_list_favorited': lambda fixtures, rng: get_recipe_list(
+        is_favorited=1,
+    ),
+    'recipe_list_shopping_cart': lambda fixtures, rng: get_recipe_list(
+        is_in_shopping_cart=1,
+    ),
+    'recipe_detail': lambda fixtures, rng: (
+        reverse('recipe-detail', args=[rng.choice(fixtures['recipes'])]),
+        {},
+    ),
+    'subscriptions': lambda fixtures, rng: (
+        reverse('customuser-subscriptions'),
+        {'limit': PAGE_SIZE, 'recipes_limit': 3},
+    ),
+    'download_shopping_cart': lambda fixtures, rng: (
+        reverse('recipe-download_shopping_cart'),
+        {},
+    ),
+    'ingredient_search': lambda fixtures, rng: (
+        reverse('ingredient-list'),
+        {'name': rng.choice(fixtures['ingredients'])},
+    ),
+    'shortlink': lambda fixtures, rng: (
+        reverse(
+            'shortlink',
+            kwargs={
+                'encoded_id': shortlinks.encode(
+                    rng.choice(fixtures['recipes']),
+                ),
+            },
+        ),
+        {},
+    ),
+}
+
+
+def reset_caches():
+    cache.clear()
+    shortlinks.paths.clear()
+    ingredient_index.reset()
+
+
+def get_fixtures(prefix):
+    user = (
+        User.objects.filter(username__startswith=prefix)
+        .annotate(
+            carts=Count('shopping_carts', distinct=True),
+            favorited=Count('favorites', distinct=True),
+            feed=Count('subscribers', distinct=True),
+        )
+        .order_by(Least('carts', 'favorited', 'feed').desc(), 'pk')
+        .first()
+    )
+    if user is None:
+        raise CommandError(
+            f'Нет пользователей с префиксом {prefix!r}, '
+            'сначала выполните generate_dataset',
+        )
+    recipes = list(Recipe.objects.order_by('pk').values_list('pk', flat=True))
+    return {
+        'user': user,
+        'recipes': recipes,
+        'pages': max(1, min(MAX_PAGE, len(recipes) // PAGE_SIZE)),
+        'authors': list(
+            Recipe.objects.order_by('author_id')
+            .values_list('author_id', flat=True)
+            .distinct(),
+        ),
+        'tags': list(
+            Tag.objects.order_by('pk').values_list('slug', flat=True),
+        ),
+        'ingredients': sorted(
+            {
+                name[:2]
+                for name in Ingredient.objects.values_list('name', flat=True)
+            },
+        ),
+    }
+
+
+class Command(BaseCommand):
+    help = (
+        'Замеряет задержку и число запросов к БД на основных эндпоинтах '
+        'API и выводит результат в JSON'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--iterations', type=int, default=100)
+        parser.add_argument('--warmup', type=int, default=10)
+        parser.add_argument('--seed', type=int, default=0)
+        parser.add_argument(
+            '--prefix',
+            default=USERNAME_PREFIX,
+            help='Префикс пользователей из generate_dataset',
+        )
+        parser.add_argument(
+            '--endpoint',
+            action='append',
+            choices=ENDPOINTS,
+            help='Замерить только указанные эндпоинты',
+        )
+        parser.add_argument(
+            '--cold',
+            action='store_true',
+            help='Сбрасывать кеши перед каждым запросом',
+        )
+        parser.add_argument(
+            '--output',
+            type=Path,
+            help='Файл для результата (по умолчанию stdout)',
+        )
+
+    def handle(self, *args, **options):
+        if options['iterations'] < 1:
+            raise CommandError('--iterations должно быть больше нуля')
+        setup_test_environment()
+        fixtures = get_fixtures(options['prefix'])
+        token, _ = Token.objects.get_or_create(user=fixtures['user'])
+        client = APIClient()
+        client.credentials(HTTP_AUTHORIZATION=f'Token {token.key}')
+        results = {}
+        for name in options['endpoint'] or ENDPOINTS:
+            rng = random.Random(f'{options["seed"]}:{name}')
+            results[name] = measure(
+                client,
+                lambda: ENDPOINTS[name](fixtures, rng),
+                options['iterations'],
+                options['warmup'],
+                reset=reset_caches if options['cold'] else None,
+            )
+        report = {
+            'meta': get_meta(
+                options,
+                cold=options['cold'],
+                dataset={
+                    'users': User.objects.count(),
+                    'recipes': len(fixtures['recipes']),
+                    'tags': len(fixtures['tags']),
+                    'ingredients': Ingredient.objects.count(),
+                    'user_shopping_carts': fixtures['user'].carts,
+                    'user_favorites': fixtures['user'].favorited,
+                    'user_subscriptions': fixtures['user'].feed,
+                },
+            ),
+            'results': results,
+        }
+        write_report(self, report, options['output'])
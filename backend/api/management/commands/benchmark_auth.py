@@ -0,0 +1,83 @@
+from pathlib import Path
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+from django.test.utils import setup_test_environment
+from django.urls import reverse
+from rest_framework.authtoken.models import Token
+from rest_framework.test import APIClient
+
+from api.authentication import invalidate_token
+from api.benchmarks import get_meta, measure, write_report
+from api.cache import is_cache_shared
+from recipes.dataset import USERNAME_PREFIX
+
+User = get_user_model()
+
+ENDPOINTS = ('customuser-me', 'tag-list')
+
+
+class Command(BaseCommand):
+    help = (
+        'Сравнивает аутентификацию по токену с кешем и без него и '
+        'выводит результат в JSON'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--iterations', type=int, default=200)
+        parser.add_argument('--warmup', type=int, default=10)
+        parser.add_argument(
+            '--prefix',
+            default=USERNAME_PREFIX,
+            help='Префикс пользователей из generate_dataset',
+        )
+        parser.add_argument(
+            '--output',
+            type=Path,
+            help='Файл для результата (по умолчанию stdout)',
+        )
+
+    def handle(self, *args, **options):
+        if options['iterations'] < 1:
+            raise CommandError('--iterations должно быть больше нуля')
+        if not is_cache_shared():
+            raise CommandError(
+                'С locmem кеш аутентификации отключён, '
+                'укажите общий CACHE_BACKEND',
+            )
+        user = (
+            User.objects.filter(username__startswith=options['prefix'])
+            .order_by('pk')
+            .first()
+        )
+        if user is None:
+            raise CommandError(
+                f'Нет пользователей с префиксом {options["prefix"]!r}, '
+                'сначала выполните generate_dataset',
+            )
+        setup_test_environment()
+        token, _ = Token.objects.get_or_create(user=user)
+        client = APIClient()
+        client.credentials(HTTP_AUTHORIZATION=f'Token {token.key}')
+        modes = {
+            'cached': None,
+            'uncached': lambda: invalidate_token(token.key),
+        }
+        results = {}
+        for name in ENDPOINTS:
+            path = reverse(name)
+            results[name] = {
+                mode: measure(
+                    client,
+                    lambda: (path, {}),
+                    options['iterations'],
+                    options['warmup'],
+                    reset=reset,
+                )
+                for mode, reset in modes.items()
+            }
+        write_report(
+            self,
+            {'meta': get_meta(options), 'results': results},
+            options['output'],
+        )
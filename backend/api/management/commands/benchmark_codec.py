@@ -0,0 +1,52 @@
+import random
+import time
+
+from django.core.management.base import BaseCommand
+
+from api import codec
+
+
+class Command(BaseCommand):
+    help = 'Измеряет скорость кодирования и декодирования коротких ссылок'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--count', type=int, default=100000)
+        parser.add_argument('--max-id', type=int, default=10 ** 7)
+
+    def measure(self, name, function, values):
+        start = time.perf_counter()
+        function(values)
+        elapsed = time.perf_counter() - start
+        self.stdout.write(
+            f'{name}: {len(values) / elapsed:,.0f} оп/с '
+            f'({elapsed * 10 ** 9 / len(values):.0f} нс на операцию)',
+        )
+
+    def handle(self, *args, **options):
+        ids = [
+            random.randint(1, options['max_id'])
+            for _ in range(options['count'])
+        ]
+        codes = codec.encode_many(ids)
+        checked = codec.encode_many(ids, checksum=True)
+        self.measure(
+            'encode',
+            lambda values: [codec.encode(value) for value in values],
+            ids,
+        )
+        self.measure('encode_many', codec.encode_many, ids)
+        self.measure(
+            'encode_many с контрольным символом',
+            lambda values: codec.encode_many(values, checksum=True),
+            ids,
+        )
+        self.measure(
+            'decode',
+            lambda values: [codec.decode(value) for value in values],
+            codes,
+        )
+        self.measure(
+            'decode с контрольным символом',
+            lambda values: [codec.decode(value) for value in values],
+            checked,
+        )
@@ -0,0 +1,120 @@
+import math
+import random
+from pathlib import Path
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from django.test.utils import setup_test_environment
+from django.urls import reverse
+from rest_framework.test import APIClient
+
+from api.benchmarks import get_meta, measure, write_report
+from recipes.dataset import USERNAME_PREFIX
+from recipes.models import Subscription
+
+User = get_user_model()
+
+SUBSCRIBER = 'benchmark_feed_subscriber'
+
+
+class Command(BaseCommand):
+    help = (
+        'Замеряет ленту подписок при разном числе подписок пользователя '
+        'и выводит результат в JSON'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--subscriptions',
+            type=int,
+            nargs='+',
+            default=[10, 100, 1000],
+            help='Число подписок, для которых выполняется замер',
+        )
+        parser.add_argument('--iterations', type=int, default=50)
+        parser.add_argument('--warmup', type=int, default=5)
+        parser.add_argument('--seed', type=int, default=0)
+        parser.add_argument('--limit', type=int, default=6)
+        parser.add_argument('--recipes-limit', type=int, default=3)
+        parser.add_argument(
+            '--prefix',
+            default=USERNAME_PREFIX,
+            help='Префикс авторов из generate_dataset',
+        )
+        parser.add_argument(
+            '--output',
+            type=Path,
+            help='Файл для результата (по умолчанию stdout)',
+        )
+
+    def handle(self, *args, **options):
+        if options['iterations'] < 1:
+            raise CommandError('--iterations должно быть больше нуля')
+        authors = list(
+            User.objects.filter(username__startswith=options['prefix'])
+            .order_by('pk')
+            .values_list('pk', flat=True),
+        )
+        if len(authors) < max(options['subscriptions']):
+            raise CommandError(
+                f'Пользователей с префиксом {options["prefix"]!r}: '
+                f'{len(authors)}, сначала выполните generate_dataset '
+                'с большим --users',
+            )
+        random.Random(options['seed']).shuffle(authors)
+        setup_test_environment()
+        with transaction.atomic():
+            results = self.measure_feeds(authors, options)
+            transaction.set_rollback(True)
+        write_report(
+            self,
+            {
+                'meta': get_meta(
+                    options,
+                    limit=options['limit'],
+                    recipes_limit=options['recipes_limit'],
+                ),
+                'results': results,
+            },
+            options['output'],
+        )
+
+    def measure_feeds(self, authors, options):
+        subscriber = User.objects.create_user(
+            username=SUBSCRIBER,
+            email=f'{SUBSCRIBER}@example.com',
+            first_name='Подписчик',
+            last_name='Ленты',
+        )
+        client = APIClient()
+        client.force_authenticate(subscriber)
+        path = reverse('customuser-subscriptions')
+        results = {}
+        for count in sorted(options['subscriptions']):
+            Subscription.objects.filter(subscriber=subscriber).delete()
+            Subscription.objects.bulk_create(
+                Subscription(subscriber=subscriber, author_id=author)
+                for author in authors[:count]
+            )
+            pages = {
+                'first_page': 1,
+                'last_page': max(1, math.ceil(count / options['limit'])),
+            }
+            results[count] = {
+                name: measure(
+                    client,
+                    lambda: (
+                        path,
+                        {
+                            'page': page,
+                            'limit': options['limit'],
+                            'recipes_limit': options['recipes_limit'],
+                        },
+                    ),
+                    options['iterations'],
+                    options['warmup'],
+                )
+                for name, page in pages.items()
+            }
+        return results
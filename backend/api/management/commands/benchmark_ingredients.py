@@ -0,0 +1,87 @@
+from pathlib import Path
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from api.benchmarks import get_meta, measure_calls, write_report
+from api.ingredient_index import IngredientIndex
+from recipes.models import Ingredient
+
+FIELDS = ('id', 'name', 'measurement_unit')
+
+
+def search_orm(prefix, limit):
+    return list(
+        Ingredient.objects.filter(name__istartswith=prefix)
+        .order_by('name')
+        .values(*FIELDS)[:limit],
+    )
+
+
+class Command(BaseCommand):
+    help = (
+        'Сравнивает поиск ингредиентов по префиксу через индекс в памяти '
+        'и через запрос к БД и выводит результат в JSON'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--prefixes',
+            nargs='+',
+            default=['с', 'сол', 'перец'],
+            help='Префиксы, по которым выполняется поиск',
+        )
+        parser.add_argument(
+            '--limit',
+            type=int,
+            default=settings.INGREDIENT_SEARCH_LIMIT,
+        )
+        parser.add_argument('--iterations', type=int, default=1000)
+        parser.add_argument('--warmup', type=int, default=50)
+        parser.add_argument(
+            '--output',
+            type=Path,
+            help='Файл для результата (по умолчанию stdout)',
+        )
+
+    def handle(self, *args, **options):
+        if options['iterations'] < 1:
+            raise CommandError('--iterations должно быть больше нуля')
+        ingredients = Ingredient.objects.count()
+        if not ingredients:
+            raise CommandError(
+                'Справочник ингредиентов пуст, сначала выполните '
+                'import_catalog',
+            )
+        limit = options['limit']
+        index = IngredientIndex()
+        results = {}
+        for prefix in options['prefixes']:
+            results[prefix] = {
+                'matches': {
+                    'index': len(index.search(prefix, limit)),
+                    'orm': len(search_orm(prefix, limit)),
+                },
+                'index': measure_calls(
+                    lambda: index.search(prefix, limit),
+                    options['iterations'],
+                    options['warmup'],
+                ),
+                'orm': measure_calls(
+                    lambda: search_orm(prefix, limit),
+                    options['iterations'],
+                    options['warmup'],
+                ),
+            }
+        write_report(
+            self,
+            {
+                'meta': get_meta(
+                    options,
+                    limit=limit,
+                    dataset={'ingredients': ingredients},
+                ),
+                'results': results,
+            },
+            options['output'],
+        )
@@ -0,0 +1,91 @@
+import math
+from pathlib import Path
+
+from django.core.management.base import BaseCommand, CommandError
+from django.test.utils import setup_test_environment
+from django.urls import reverse
+from rest_framework.test import APIClient
+
+from api.benchmarks import get_meta, measure, write_report
+from recipes.models import Recipe
+
+
+class Command(BaseCommand):
+    help = (
+        'Сравнивает постраничную и курсорную пагинацию списка рецептов '
+        'на разной глубине и выводит результат в JSON'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--depths',
+            type=int,
+            nargs='+',
+            default=[1, 10, 100, 1000],
+            help='Номера страниц, на которых выполняется замер',
+        )
+        parser.add_argument('--limit', type=int, default=6)
+        parser.add_argument('--iterations', type=int, default=50)
+        parser.add_argument('--warmup', type=int, default=5)
+        parser.add_argument(
+            '--output',
+            type=Path,
+            help='Файл для результата (по умолчанию stdout)',
+        )
+
+    def handle(self, *args, **options):
+        if options['iterations'] < 1:
+            raise CommandError('--iterations должно быть больше нуля')
+        setup_test_environment()
+        limit = options['limit']
+        recipes = Recipe.objects.count()
+        pages = math.ceil(recipes / limit)
+        depths = sorted(
+            depth for depth in set(options['depths']) if 1 <= depth <= pages
+        )
+        if not depths:
+            raise CommandError(
+                f'Рецептов {recipes}: нет страниц для замера, сначала '
+                'выполните generate_dataset',
+            )
+        client = APIClient()
+        path = reverse('recipe-list')
+        cursors = self.get_cursors(client, path, limit, depths)
+        results = {}
+        for depth in depths:
+            results[depth] = {
+                'page': measure(
+                    client,
+                    lambda: (path, {'page': depth, 'limit': limit}),
+                    options['iterations'],
+                    options['warmup'],
+                ),
+                'cursor': measure(
+                    client,
+                    lambda: (cursors[depth], {}),
+                    options['iterations'],
+                    options['warmup'],
+                ),
+            }
+        write_report(
+            self,
+            {
+                'meta': get_meta(
+                    options,
+                    limit=limit,
+                    dataset={'recipes': recipes, 'pages': pages},
+                ),
+                'results': results,
+            },
+            options['output'],
+        )
+
+    def get_cursors(self, client, path, limit, depths):
+        url = f'{path}?pagination=cursor&limit={limit}'
+        cursors = {}
+        for depth in range(1, depths[-1]):
+            if depth in depths:
+                cursors[depth] = url
+            url = client.get(url).data['next']
+        cursors[depths[-1]] = url
+        return cursors
@@ -0,0 +1,59 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from api.tests.query_budget import (
+    BUDGET_FILE,
+    check_budget,
+    get_budget,
+    get_missing_scenarios,
+    get_routes,
+    load_budget,
+    measure_in_test_db,
+    save_budget,
+)
+
+
+class Command(BaseCommand):
+    help = (
+        'Проверяет число SQL-запросов для каждого маршрута API на нескольких '
+        'объёмах данных и сравнивает его с бюджетом из query_budget.json'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--update',
+            action='store_true',
+            help='Перезаписать бюджет текущими значениями',
+        )
+        parser.add_argument(
+            '--keepdb',
+            action='store_true',
+            help='Не удалять тестовую базу после проверки',
+        )
+
+    def handle(self, *args, **options):
+        routes = get_routes()
+        missing = get_missing_scenarios(routes)
+        if missing:
+            raise CommandError(
+                'Нет сценария для маршрутов: ' + ', '.join(missing),
+            )
+        results = measure_in_test_db(routes, keepdb=options['keepdb'])
+        lines, errors = check_budget(
+            routes,
+            results,
+            load_budget(),
+            update=options['update'],
+        )
+        for line in lines:
+            self.stdout.write(line)
+        if errors:
+            raise CommandError('\n'.join(errors))
+        if options['update']:
+            save_budget(get_budget(results))
+            self.stdout.write(
+                self.style.SUCCESS(f'Бюджет сохранён в {BUDGET_FILE}'),
+            )
+            return
+        self.stdout.write(
+            self.style.SUCCESS('Число запросов в пределах бюджета'),
+        )
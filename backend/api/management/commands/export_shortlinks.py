@@ -0,0 +1,14 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from api.shortlinks import export_map
+
+
+class Command(BaseCommand):
+    help = 'Выгружает карту коротких ссылок на рецепты для nginx'
+
+    def handle(self, *args, **options):
+        if not settings.SHORTLINK_MAP_FILE:
+            raise CommandError('Не задан SHORTLINK_MAP_FILE')
+        path = export_map()
+        self.stdout.write(self.style.SUCCESS(f'Карта сохранена в {path}'))
@@ -0,0 +1,86 @@
+import time
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+
+from api.cache import bump_version
+from api.ingredient_index import ingredient_index
+from api.shortlinks import export_map
+from recipes.dataset import USERNAME_PREFIX, generate
+from recipes.popularity import refresh_popularity
+
+User = get_user_model()
+
+
+class Command(BaseCommand):
+    help = (
+        'Создаёт синтетический набор данных: пользователей, рецепты, '
+        'избранное, корзины и подписки'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--users', type=int, default=100)
+        parser.add_argument(
+            '--recipes',
+            type=float,
+            default=5,
+            help='Среднее число рецептов на пользователя',
+        )
+        parser.add_argument(
+            '--favorites',
+            type=float,
+            default=10,
+            help='Среднее число рецептов в избранном у пользователя',
+        )
+        parser.add_argument(
+            '--shopping-carts',
+            type=float,
+            default=3,
+            help='Среднее число рецептов в корзине у пользователя',
+        )
+        parser.add_argument(
+            '--subscriptions',
+            type=float,
+            default=5,
+            help='Среднее число подписок у пользователя',
+        )
+        parser.add_argument('--seed', type=int, default=0)
+        parser.add_argument(
+            '--prefix',
+            default=USERNAME_PREFIX,
+            help='Префикс имён создаваемых пользователей',
+        )
+
+    def handle(self, *args, **options):
+        prefix = options['prefix']
+        if User.objects.filter(username__startswith=prefix).exists():
+            raise CommandError(
+                f'Пользователи с префиксом {prefix!r} уже есть, '
+                'укажите другой --prefix',
+            )
+        start = time.perf_counter()
+        dataset = generate(
+            options['users'],
+            recipes=options['recipes'],
+            favorites=options['favorites'],
+            shopping_carts=options['shopping_carts'],
+            subscriptions=options['subscriptions'],
+            seed=options['seed'],
+            prefix=prefix,
+        )
+        refresh_popularity()
+        ingredient_index.invalidate()
+        bump_version('ingredients', 'tags', 'recipes')
+        if settings.SHORTLINK_MAP_FILE:
+            export_map()
+        elapsed = time.perf_counter() - start
+        self.stdout.write(
+            ', '.join(
+                f'{name}: {count}'
+                for name, count in dataset._asdict().items()
+            ),
+        )
+        self.stdout.write(
+            self.style.SUCCESS(f'Набор данных создан за {elapsed:.2f} с'),
+        )
@@ -0,0 +1,25 @@
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand
+
+from api.images import generate_renditions_safely
+from recipes.models import Recipe
+
+User = get_user_model()
+
+
+class Command(BaseCommand):
+    help = 'Создаёт уменьшенные копии изображений рецептов и аватаров'
+
+    def handle(self, *args, **options):
+        names = list(
+            Recipe.objects.exclude(image='').values_list('image', flat=True),
+        )
+        names += User.objects.exclude(avatar__isnull=True).exclude(
+            avatar='',
+        ).values_list('avatar', flat=True)
+        created = sum(generate_renditions_safely(name) or 0 for name in names)
+        self.stdout.write(
+            self.style.SUCCESS(
+                f'Изображений: {len(names)}, создано превью: {created}',
+            ),
+        )
@@ -0,0 +1,72 @@
+import time
+from pathlib import Path
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from api.cache import bump_version
+from recipes.catalog import CATALOGS, import_catalog
+
+VERSION_GROUPS = {
+    'ingredients': ('ingredients',),
+    'tags': ('tags', 'recipes'),
+}
+
+
+class Command(BaseCommand):
+    help = 'Загружает справочники ингредиентов и тегов из CSV или JSON'
+
+    def add_arguments(self, parser):
+        for source in CATALOGS:
+            parser.add_argument(
+                f'--{source}',
+                type=Path,
+                help=(
+                    f'Файл справочника {source} (.csv или .json), по '
+                    f'умолчанию {source}.csv из CATALOG_DIR'
+                ),
+            )
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=settings.CATALOG_BATCH_SIZE,
+        )
+        parser.add_argument(
+            '--force',
+            action='store_true',
+            help='Загрузить даже если файл не изменился',
+        )
+
+    def handle(self, *args, **options):
+        paths = {
+            source: options[source]
+            for source in CATALOGS
+            if options[source]
+        } or {
+            source: settings.CATALOG_DIR / f'{source}.csv'
+            for source in CATALOGS
+        }
+        for source, path in paths.items():
+            if not path.is_file():
+                raise CommandError(f'Файл не найден: {path}')
+            start = time.perf_counter()
+            result = import_catalog(
+                source,
+                path,
+                options['batch_size'],
+                options['force'],
+            )
+            elapsed = time.perf_counter() - start
+            if result is None:
+                self.stdout.write(f'{source}: файл не изменился, пропущено')
+                continue
+            if result.inserted or result.updated:
+                bump_version(*VERSION_GROUPS[source])
+            self.stdout.write(
+                f'{source}: строк {result.rows}, добавлено {result.inserted}, '
+                f'обновлено {result.updated}, без изменений '
+                f'{result.rows - result.inserted - result.updated} '
+                f'за {elapsed:.2f} с '
+                f'({result.rows / max(elapsed, 1e-6):.0f} строк/с)',
+            )
+        self.stdout.write(self.style.SUCCESS('Справочники загружены'))
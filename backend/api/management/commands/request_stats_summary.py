@@ -0,0 +1,76 @@
+import json
+from collections import defaultdict
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from api.request_stats import percentile
+
+PERCENTILES = (('p50', 0.5), ('p95', 0.95), ('p99', 0.99))
+
+
+class Command(BaseCommand):
+    help = 'Сводка журнала RequestStatsMiddleware по эндпоинтам'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            'log',
+            nargs='?',
+            default=settings.REQUEST_STATS_LOG,
+            help='Файл журнала (по умолчанию REQUEST_STATS_LOG)',
+        )
+        parser.add_argument('--json', action='store_true')
+
+    def read_records(self, path):
+        try:
+            with open(path, encoding='utf-8') as file:
+                for line in file:
+                    try:
+                        yield json.loads(line)
+                    except ValueError:
+                        continue
+        except OSError as error:
+            raise CommandError(f'Не удалось прочитать журнал: {error}')
+
+    def summarize(self, records):
+        groups = defaultdict(list)
+        for record in records:
+            endpoint = '{} {}{}'.format(
+                record['method'],
+                record['view'],
+                f".{record['action']}" if record['action'] else '',
+            )
+            groups[endpoint].append(record)
+        summary = []
+        for endpoint, items in sorted(groups.items()):
+            durations = [item['duration_ms'] for item in items]
+            queries = [item['queries'] for item in items]
+            row = {'endpoint': endpoint, 'requests': len(items)}
+            for name, fraction in PERCENTILES:
+                row[f'{name}_ms'] = percentile(durations, fraction)
+            row['p50_queries'] = percentile(queries, 0.5)
+            row['max_queries'] = max(queries)
+            row['sql_ms_avg'] = round(
+                sum(item['sql_ms'] for item in items) / len(items),
+                2,
+            )
+            row['n_plus_one'] = sum(
+                1 for item in items if item['repeated_queries']
+            )
+            summary.append(row)
+        return summary
+
+    def handle(self, *args, **options):
+        if not options['log']:
+            raise CommandError('Не задан файл журнала')
+        summary = self.summarize(self.read_records(options['log']))
+        if options['json']:
+            self.stdout.write(json.dumps(summary, ensure_ascii=False))
+            return
+        for row in summary:
+            self.stdout.write(
+                '{endpoint}: {requests} запр., p50 {p50_ms} мс, '
+                'p95 {p95_ms} мс, p99 {p99_ms} мс, запросов к БД '
+                'p50 {p50_queries} / max {max_queries}, SQL в среднем '
+                '{sql_ms_avg} мс, N+1: {n_plus_one}'.format(**row),
+            )
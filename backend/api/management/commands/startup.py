@@ -0,0 +1,163 @@
+import hashlib
+import os
+import shutil
+import time
+from contextlib import contextmanager
+from pathlib import Path
+
+from django.conf import settings
+from django.core.management import call_command
+from django.core.management.base import BaseCommand
+from django.db import DatabaseError, connection
+from django.db.migrations.loader import MigrationLoader
+
+from recipes.catalog import CATALOGS, get_checksum
+
+STATIC_STAMP = '.collected'
+
+STATE_SQL = (
+    "SELECT 'migration', app || '.' || name FROM django_migrations "
+    "UNION ALL "
+    "SELECT 'catalog', source || ':' || checksum FROM recipes_catalogimport"
+)
+
+
+def get_state():
+    state = {'migration': set(), 'catalog': set()}
+    try:
+        with connection.cursor() as cursor:
+            cursor.execute(STATE_SQL)
+            for kind, value in cursor.fetchall():
+                state[kind].add(value)
+    except DatabaseError:
+        pass
+    return state
+
+
+def get_static_stamp(root):
+    digest = hashlib.sha256()
+    for directory, _, files in sorted(os.walk(root)):
+        for name in sorted(files):
+            path = os.path.join(directory, name)
+            stat = os.stat(path)
+            digest.update(
+                f'{os.path.relpath(path, root)}:{stat.st_size}:'
+                f'{stat.st_mtime_ns}\n'.encode(),
+            )
+    return digest.hexdigest()
+
+
+class Command(BaseCommand):
+    help = (
+        'Готовит контейнер к запуску: применяет миграции, загружает '
+        'справочники, выгружает короткие ссылки и копирует статику, '
+        'только если это нужно'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--init',
+            action='store_true',
+            help='Выполнить все шаги без проверки состояния',
+        )
+        parser.add_argument(
+            '--catalog',
+            type=Path,
+            help='Фикстура со справочниками (по умолчанию CSV из CATALOG_DIR)',
+        )
+        parser.add_argument(
+            '--static-dest',
+            type=Path,
+            help='Каталог, куда копируется собранная статика',
+        )
+
+    @contextmanager
+    def phase(self, name):
+        start = time.perf_counter()
+        yield
+        elapsed = time.perf_counter() - start
+        self.timings.append((name, elapsed))
+        self.stdout.write(f'{name}: {elapsed:.3f} с')
+
+    def skip(self, name):
+        self.timings.append((name, None))
+        self.stdout.write(f'{name}: пропущено')
+
+    def get_catalog_paths(self, catalog):
+        return {
+            source: catalog or settings.CATALOG_DIR / f'{source}.csv'
+            for source in CATALOGS
+        }
+
+    def handle(self, *args, **options):
+        self.timings = []
+        start = time.perf_counter()
+        force = options['init']
+        with self.phase('check'):
+            state = get_state()
+            loader = MigrationLoader(None, ignore_no_migrations=True)
+            pending = {
+                f'{app}.{name}' for app, name in loader.graph.nodes
+            } - state['migration']
+            paths = {
+                source: path
+                for source, path in self.get_catalog_paths(
+                    options['catalog'],
+                ).items()
+                if path.is_file()
+            }
+            stale = {
+                source: path
+                for source, path in paths.items()
+                if f'{source}:{get_checksum(path)}' not in state['catalog']
+            }
+        if force or pending:
+            with self.phase('migrate'):
+                call_command('migrate', interactive=False, verbosity=0)
+        else:
+            self.skip('migrate')
+        if (force and paths) or stale:
+            with self.phase('catalog'):
+                call_command(
+                    'import_catalog',
+                    **(paths if force else stale),
+                    force=force,
+                    stdout=self.stdout,
+                )
+        else:
+            self.skip('catalog')
+        map_file = settings.SHORTLINK_MAP_FILE
+        if map_file and (force or not Path(map_file).is_file()):
+            with self.phase('shortlinks'):
+                call_command('export_shortlinks', stdout=self.stdout)
+        elif map_file:
+            self.skip('shortlinks')
+        destination = options['static_dest']
+        if destination:
+            self.copy_static(destination, force)
+        phases = ' '.join(
+            f'{name}={"skip" if elapsed is None else f"{elapsed:.3f}"}'
+            for name, elapsed in self.timings
+        )
+        self.stdout.write(
+            self.style.SUCCESS(
+                f'Подготовка завершена за {time.perf_counter() - start:.3f} с '
+                f'({phases})',
+            ),
+        )
+
+    def copy_static(self, destination, force):
+        stamp = destination / STATIC_STAMP
+        with self.phase('static_check'):
+            expected = get_static_stamp(settings.STATIC_ROOT)
+            current = stamp.read_text() if stamp.is_file() else None
+        if not force and current == expected:
+            self.skip('static')
+            return
+        with self.phase('static'):
+            shutil.copytree(
+                settings.STATIC_ROOT,
+                destination,
+                dirs_exist_ok=True,
+            )
+            stamp.write_text(expected)
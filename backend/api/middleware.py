@@ -0,0 +1,70 @@
+import json
+import logging
+import time
+
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+from django.db import connection
+
+from .request_stats import RequestStats, instrument_serializers, set_current
+
+logger = logging.getLogger('api.request_stats')
+
+
+class RequestStatsMiddleware:
+    def __init__(self, get_response):
+        if not settings.REQUEST_STATS:
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+        instrument_serializers()
+
+    def __call__(self, request):
+        stats = RequestStats()
+        request.stats = stats
+        set_current(stats)
+        try:
+            with connection.execute_wrapper(stats):
+                response = self.get_response(request)
+        finally:
+            set_current(None)
+        self.report(request, response, stats)
+        return response
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        stats = request.stats
+        view = getattr(view_func, 'cls', view_func)
+        stats.view = f'{view.__module__}.{view.__name__}'
+        actions = getattr(view_func, 'actions', None) or {}
+        stats.action = actions.get(request.method.lower())
+
+    def report(self, request, response, stats):
+        total = time.perf_counter() - stats.start
+        repeated = stats.get_repeated(settings.REQUEST_STATS_REPEAT_THRESHOLD)
+        response['Server-Timing'] = ', '.join(
+            (
+                f'db;dur={stats.sql_time * 1000:.1f};'
+                f'desc="{stats.queries} queries"',
+                f'serializer;dur={stats.serializer_time * 1000:.1f}',
+                f'total;dur={total * 1000:.1f}',
+            ),
+        )
+        logger.info(
+            json.dumps(
+                {
+                    'method': request.method,
+                    'path': request.path,
+                    'view': stats.view,
+                    'action': stats.action,
+                    'status': response.status_code,
+                    'duration_ms': round(total * 1000, 2),
+                    'queries': stats.queries,
+                    'sql_ms': round(stats.sql_time * 1000, 2),
+                    'serializer_ms': round(stats.serializer_time * 1000, 2),
+                    'response_bytes': (
+                        None if response.streaming else len(response.content)
+                    ),
+                    'repeated_queries': repeated,
+                },
+                ensure_ascii=False,
+            ),
+        )
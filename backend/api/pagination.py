@@ -1,5 +1,47 @@
-from rest_framework.pagination import PageNumberPagination
+from django.conf import settings
+from rest_framework.exceptions import ValidationError
+from rest_framework.pagination import CursorPagination, PageNumberPagination
+
+CURSOR_ORDERINGS = {
+    ('-id',): ('-id',),
+    ('-favorites_count',): ('-favorites_count', '-id'),
+    ('-favorites_count', '-id'): ('-favorites_count', '-id'),
+}
 
 
 class CustomPageNumberPagination(PageNumberPagination):
     page_size_query_param = 'limit'
+
+
+class CustomCursorPagination(CursorPagination):
+    page_size_query_param = 'limit'
+    ordering = '-id'
+
+    def get_ordering(self, request, queryset, view):
+        ordering = tuple(queryset.query.order_by) or (self.ordering,)
+        if ordering not in CURSOR_ORDERINGS:
+            raise ValidationError(
+                {'pagination': settings.ERROR_MESSAGES.get('cursor_ordering')},
+            )
+        return CURSOR_ORDERINGS[ordering]
+
+
+class CursorOrPageNumberPagination(CustomPageNumberPagination):
+    mode_query_param = 'pagination'
+    cursor_pagination_class = CustomCursorPagination
+    cursor_paginator = None
+
+    def paginate_queryset(self, queryset, request, view=None):
+        if request.query_params.get(self.mode_query_param) == 'cursor':
+            self.cursor_paginator = self.cursor_pagination_class()
+            return self.cursor_paginator.paginate_queryset(
+                queryset,
+                request,
+                view,
+            )
+        return super().paginate_queryset(queryset, request, view)
+
+    def get_paginated_response(self, data):
+        if self.cursor_paginator:
+            return self.cursor_paginator.get_paginated_response(data)
+        return super().get_paginated_response(data)
@@ -0,0 +1,66 @@
+from array import array
+from bisect import bisect_left
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+
+from recipes.models import Favorite, ShoppingCart
+from .cache import bump_version, get_version
+
+CACHE_GROUP = 'recipe_state:{}'
+CACHE_KEY = 'recipe_state:{}:{}'
+
+
+def contains(ids, recipe_id):
+    index = bisect_left(ids, recipe_id)
+    return index < len(ids) and ids[index] == recipe_id
+
+
+class RecipeState:
+    __slots__ = ('favorites', 'shopping_cart')
+
+    def __init__(self, favorites=(), shopping_cart=()):
+        self.favorites = array('q', sorted(favorites))
+        self.shopping_cart = array('q', sorted(shopping_cart))
+
+    def __getstate__(self):
+        return self.favorites, self.shopping_cart
+
+    def __setstate__(self, state):
+        self.favorites, self.shopping_cart = state
+
+    def is_favorited(self, recipe_id):
+        return contains(self.favorites, recipe_id)
+
+    def is_in_shopping_cart(self, recipe_id):
+        return contains(self.shopping_cart, recipe_id)
+
+
+def get_recipe_state(user):
+    if not user.is_authenticated:
+        return RecipeState()
+    key = CACHE_KEY.format(
+        user.id,
+        get_version(CACHE_GROUP.format(user.id)),
+    )
+    state = cache.get(key)
+    if state is None:
+        state = RecipeState(
+            Favorite.objects.filter(customer=user).values_list(
+                'recipe_id',
+                flat=True,
+            ),
+            ShoppingCart.objects.filter(customer=user).values_list(
+                'recipe_id',
+                flat=True,
+            ),
+        )
+        cache.add(key, state, settings.RECIPE_STATE_CACHE_TIMEOUT)
+    return state
+
+
+def invalidate_recipe_state(user_id):
+    group = CACHE_GROUP.format(user_id)
+    bump_version(group)
+    transaction.on_commit(lambda: bump_version(group))
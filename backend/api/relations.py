@@ -0,0 +1,219 @@
+from django.db import connection, transaction
+
+from recipes.models import Favorite, ShoppingCart, Subscription
+from recipes.signals import relations_changed
+
+CREATED = 'created'
+DELETED = 'deleted'
+EXISTS = 'exists'
+MISSING = 'missing'
+NOT_FOUND = 'not_found'
+SELF = 'self'
+
+
+class Relation:
+    def __init__(self, model, owner_field, target_field, allow_self=True):
+        self.model = model
+        self.owner_field = owner_field
+        self.target_field = target_field
+        self.target_model = model._meta.get_field(
+            target_field,
+        ).related_model
+        self.allow_self = allow_self
+
+    def get_status(self, owner, pk, targets):
+        if pk not in targets:
+            return NOT_FOUND
+        if not self.allow_self and pk == owner.pk:
+            return SELF
+        return None
+
+    def add(self, owner, ids):
+        targets = set(
+            self.target_model.objects.filter(pk__in=ids).values_list(
+                'pk',
+                flat=True,
+            ),
+        )
+        statuses = {pk: self.get_status(owner, pk, targets) for pk in ids}
+        with transaction.atomic(savepoint=False):
+            created = self.insert(
+                owner,
+                [pk for pk, status in statuses.items() if status is None],
+            )
+            self.send_changed(owner, created, 1)
+        results = []
+        for pk in ids:
+            status = statuses[pk]
+            if status is None:
+                status = CREATED if pk in created else EXISTS
+            results.append({'id': pk, 'status': status})
+        return results
+
+    def remove(self, owner, ids):
+        targets = set(
+            self.target_model.objects.filter(pk__in=ids).values_list(
+                'pk',
+                flat=True,
+            ),
+        )
+        with transaction.atomic(savepoint=False):
+            deleted = self.delete(owner, targets)
+            self.send_changed(owner, deleted, -1)
+        results = []
+        for pk in ids:
+            status = self.get_status(owner, pk, targets)
+            if status is None:
+                status = DELETED if pk in deleted else MISSING
+            results.append({'id': pk, 'status': status})
+        return results
+
+    def delete(self, owner, target_ids):
+        if not target_ids:
+            return set()
+        quote = connection.ops.quote_name
+        meta = self.model._meta
+        target_column = quote(meta.get_field(self.target_field).column)
+        with connection.cursor() as cursor:
+            cursor.execute(
+                'DELETE FROM {} WHERE {} = %s AND {} = ANY(%s) '
+                'RETURNING {}'.format(
+                    quote(meta.db_table),
+                    quote(meta.get_field(self.owner_field).column),
+                    target_column,
+                    target_column,
+                ),
+                [owner.pk, sorted(target_ids)],
+            )
+            return {row[0] for row in cursor.fetchall()}
+
+    def insert(self, owner, target_ids):
+        if not target_ids:
+            return set()
+        quote = connection.ops.quote_name
+        meta = self.model._meta
+        rows = [self.get_insert_values(owner, pk) for pk in sorted(target_ids)]
+        columns = rows[0][0]
+        row = '({})'.format(', '.join(['%s'] * len(columns)))
+        with connection.cursor() as cursor:
+            cursor.execute(
+                'INSERT INTO {} ({}) VALUES {} ON CONFLICT DO NOTHING '
+                'RETURNING {}'.format(
+                    quote(meta.db_table),
+                    ', '.join(columns),
+                    ', '.join([row] * len(rows)),
+                    quote(meta.get_field(self.target_field).column),
+                ),
+                [value for _, values in rows for value in values],
+            )
+            return {row[0] for row in cursor.fetchall()}
+
+    def get_insert_values(self, owner, pk):
+        instance = self.model(
+            **{
+                f'{self.owner_field}_id': owner.pk,
+                f'{self.target_field}_id': pk,
+            },
+        )
+        columns = []
+        values = []
+        for field in self.model._meta.concrete_fields:
+            if field.primary_key:
+                continue
+            columns.append(connection.ops.quote_name(field.column))
+            values.append(
+                field.get_db_prep_save(
+                    field.pre_save(instance, True),
+                    connection,
+                ),
+            )
+        return columns, values
+
+    def add_one(self, owner, pk, fields=None):
+        quote = connection.ops.quote_name
+        meta = self.model._meta
+        target_meta = self.target_model._meta
+        fields = fields or (target_meta.pk.name,)
+        target_columns = [
+            target_meta.get_field(name).column
+            for name in fields
+        ]
+        columns, values = self.get_insert_values(owner, pk)
+        target_pk = quote(target_meta.pk.column)
+        with transaction.atomic(savepoint=False):
+            with connection.cursor() as cursor:
+                cursor.execute(
+                    'WITH target AS (SELECT {} FROM {} WHERE {} = %s), '
+                    'inserted AS (INSERT INTO {} ({}) SELECT {} FROM target '
+                    'ON CONFLICT DO NOTHING RETURNING 1) '
+                    'SELECT {}, EXISTS(SELECT 1 FROM inserted) '
+                    'FROM target'.format(
+                        ', '.join(map(quote, target_columns)),
+                        quote(target_meta.db_table),
+                        target_pk,
+                        quote(meta.db_table),
+                        ', '.join(columns),
+                        ', '.join(['%s'] * len(values)),
+                        ', '.join(map(quote, target_columns)),
+                    ),
+                    [pk, *values],
+                )
+                row = cursor.fetchone()
+            if row is None:
+                return None, False
+            if row[-1]:
+                self.send_changed(owner, [pk], 1)
+        target = self.target_model.from_db(
+            connection.alias,
+            [target_meta.get_field(name).attname for name in fields],
+            row[:-1],
+        )
+        return target, row[-1]
+
+    def remove_one(self, owner, pk):
+        quote = connection.ops.quote_name
+        meta = self.model._meta
+        target_meta = self.target_model._meta
+        target_pk = quote(target_meta.pk.column)
+        with transaction.atomic(savepoint=False):
+            with connection.cursor() as cursor:
+                cursor.execute(
+                    'WITH target AS (SELECT {} FROM {} WHERE {} = %s), '
+                    'deleted AS (DELETE FROM {} WHERE {} = %s '
+                    'AND {} IN (SELECT {} FROM target) RETURNING 1) '
+                    'SELECT EXISTS(SELECT 1 FROM deleted) FROM target'.format(
+                        target_pk,
+                        quote(target_meta.db_table),
+                        target_pk,
+                        quote(meta.db_table),
+                        quote(meta.get_field(self.owner_field).column),
+                        quote(meta.get_field(self.target_field).column),
+                        target_pk,
+                    ),
+                    [pk, owner.pk],
+                )
+                row = cursor.fetchone()
+            if row is None:
+                return False, False
+            if row[0]:
+                self.send_changed(owner, [pk], -1)
+        return True, row[0]
+
+    def send_changed(self, owner, target_ids, delta):
+        if target_ids:
+            relations_changed.send(
+                sender=self.model,
+                owner_id=owner.pk,
+                target_ids=sorted(target_ids),
+                delta=delta,
+            )
+
+
+favorites = Relation(Favorite, 'customer', 'recipe')
+shopping_carts = Relation(ShoppingCart, 'customer', 'recipe')
+subscriptions = Relation(
+    Subscription,
+    'subscriber',
+    'author',
+    allow_self=False,
+)
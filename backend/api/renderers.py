@@ -0,0 +1,71 @@
+import abc
+import csv
+import json
+
+from rest_framework import renderers
+
+HEADER = ('Название', 'Количество', 'Единицы измерения')
+
+
+class Echo:
+    def write(self, value):
+        return value
+
+
+class ShoppingListRenderer(renderers.BaseRenderer, abc.ABC):
+    charset = 'utf-8'
+
+    @abc.abstractmethod
+    def stream(self, rows):
+        pass
+
+
+class CSVShoppingListRenderer(ShoppingListRenderer):
+    media_type = 'text/csv'
+    format = 'csv'
+
+    def stream(self, rows):
+        writer = csv.writer(Echo())
+        yield writer.writerow(HEADER)
+        for row in rows:
+            yield writer.writerow(
+                (row['name'], row['total_amount'], row['measurement_unit']),
+            )
+
+
+class TextShoppingListRenderer(ShoppingListRenderer):
+    media_type = 'text/plain'
+    format = 'txt'
+
+    def stream(self, rows):
+        yield 'Список покупок\n\n'
+        for row in rows:
+            yield '{name} ({measurement_unit}) — {total_amount}\n'.format(
+                **row,
+            )
+
+
+class JSONShoppingListRenderer(ShoppingListRenderer):
+    media_type = 'application/json'
+    format = 'json'
+
+    def stream(self, rows):
+        separator = '['
+        for row in rows:
+            yield separator + json.dumps(
+                {
+                    'name': row['name'],
+                    'amount': row['total_amount'],
+                    'measurement_unit': row['measurement_unit'],
+                },
+                ensure_ascii=False,
+            )
+            separator = ','
+        yield ']' if separator == ',' else '[]'
+
+
+SHOPPING_LIST_RENDERERS = (
+    CSVShoppingListRenderer,
+    TextShoppingListRenderer,
+    JSONShoppingListRenderer,
+)
@@ -0,0 +1,91 @@
+import math
+import threading
+import time
+from collections import Counter
+
+from rest_framework import serializers
+
+local = threading.local()
+
+
+def percentile(values, fraction):
+    if not values:
+        return None
+    values = sorted(values)
+    return values[max(math.ceil(fraction * len(values)) - 1, 0)]
+
+
+class RequestStats:
+    __slots__ = (
+        'start',
+        'view',
+        'action',
+        'queries',
+        'sql_time',
+        'serializer_time',
+        'serializer_depth',
+        'statements',
+    )
+
+    def __init__(self):
+        self.start = time.perf_counter()
+        self.view = None
+        self.action = None
+        self.queries = 0
+        self.sql_time = 0.0
+        self.serializer_time = 0.0
+        self.serializer_depth = 0
+        self.statements = Counter()
+
+    def __call__(self, execute, sql, params, many, context):
+        start = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.sql_time += time.perf_counter() - start
+            self.queries += 1
+            self.statements[sql] += 1
+
+    def get_repeated(self, threshold):
+        return [
+            {'sql': sql, 'count': count}
+            for sql, count in self.statements.most_common()
+            if count >= threshold
+        ]
+
+
+def get_current():
+    return getattr(local, 'stats', None)
+
+
+def set_current(stats):
+    local.stats = stats
+
+
+def timed_data(prop):
+    def data(self):
+        stats = get_current()
+        if stats is None:
+            return prop.fget(self)
+        stats.serializer_depth += 1
+        start = time.perf_counter()
+        try:
+            return prop.fget(self)
+        finally:
+            stats.serializer_depth -= 1
+            if not stats.serializer_depth:
+                stats.serializer_time += time.perf_counter() - start
+
+    return property(data)
+
+
+def instrument_serializers():
+    for serializer_class in (
+        serializers.Serializer,
+        serializers.ListSerializer,
+    ):
+        prop = serializer_class.__dict__['data']
+        if not getattr(prop.fget, 'instrumented', False):
+            wrapped = timed_data(prop)
+            wrapped.fget.instrumented = True
+            serializer_class.data = wrapped
@@ -1,6 +1,7 @@
 from django.conf import settings
 from django.contrib.auth import get_user_model
-from django.shortcuts import get_object_or_404
+from django.db import transaction
+from django.db.models import Prefetch, prefetch_related_objects
 from rest_framework import serializers
 from rest_framework.validators import UniqueValidator
 
@@ -14,15 +15,26 @@ from recipes.models import (
     Tag,
     TagInRecipe,
 )
+from .cache import bump_version
 from .fields import Base64ImageField
+from .images import get_rendition_urls
+from .recipe_state import get_recipe_state
+from .shopping_list import invalidate_recipe_shopping_lists
+from .shortlinks import get_short_links
 
 User = get_user_model()
 
 
 class UserSerializer(serializers.ModelSerializer):
     is_subscribed = serializers.SerializerMethodField()
+    avatar_renditions = serializers.SerializerMethodField()
+
+    def get_avatar_renditions(self, obj):
+        return get_rendition_urls(obj.avatar, self.context.get('request'))
 
     def get_is_subscribed(self, obj):
+        if hasattr(obj, 'is_subscribed'):
+            return obj.is_subscribed
         user = self.context.get('request').user
         if user.is_authenticated:
             return Subscription.objects.filter(
@@ -41,6 +53,7 @@ class UserSerializer(serializers.ModelSerializer):
             'last_name',
             'is_subscribed',
             'avatar',
+            'avatar_renditions',
         )
 
     def validate_username(self, value):
@@ -111,10 +124,7 @@ class TagSerializer(serializers.ModelSerializer):
 
 
 class TagsInRecipeSerializer(serializers.ModelSerializer):
-    id = serializers.PrimaryKeyRelatedField(
-        queryset=Tag.objects.all(),
-        many=False,
-    )
+    id = serializers.IntegerField(min_value=1)
 
     class Meta:
         model = Tag
@@ -123,10 +133,7 @@ class TagsInRecipeSerializer(serializers.ModelSerializer):
 
 
 class AmountOfIngredientInRecipeSerializer(serializers.ModelSerializer):
-    id = serializers.PrimaryKeyRelatedField(
-        queryset=Ingredient.objects.all(),
-        many=False,
-    )
+    id = serializers.IntegerField(min_value=1)
 
     class Meta:
         model = AmountOfIngredientInRecipe
@@ -155,33 +162,42 @@ class RecipeCreateUpdateSerializer(serializers.ModelSerializer):
     )
     tags = TagsInRecipeSerializer(many=True, required=True)
 
+    def resolve_ids(self, value, model, repeat_error, missing_error):
+        ids = [item['id'] for item in value]
+        if len(set(ids)) != len(ids):
+            raise serializers.ValidationError(
+                settings.ERROR_MESSAGES.get(repeat_error),
+            )
+        objects = model.objects.only('id').in_bulk(ids)
+        missing = [pk for pk in ids if pk not in objects]
+        if missing:
+            raise serializers.ValidationError(
+                settings.ERROR_MESSAGES.get(missing_error).format(
+                    ids=', '.join(map(str, missing)),
+                ),
+            )
+        for item in value:
+            item['id'] = objects[item['id']]
+        return value
+
     def validate_ingredients(self, value):
         if not value:
             raise serializers.ValidationError(
                 settings.ERROR_MESSAGES.get('empty_ingredients'),
             )
-        validated_value = []
-        for val in value:
-            if val in validated_value:
-                raise serializers.ValidationError(
-                    settings.ERROR_MESSAGES.get('repeat_ingredients'),
-                )
-            validated_value.append(val)
-        return value
+        return self.resolve_ids(
+            value,
+            Ingredient,
+            'repeat_ingredients',
+            'missing_ingredients',
+        )
 
     def validate_tags(self, value):
         if not value:
             raise serializers.ValidationError(
                 settings.ERROR_MESSAGES.get('empty_tags'),
             )
-        validated_value = []
-        for val in value:
-            if val in validated_value:
-                raise serializers.ValidationError(
-                    settings.ERROR_MESSAGES.get('repeat_tags'),
-                )
-            validated_value.append(val)
-        return value
+        return self.resolve_ids(value, Tag, 'repeat_tags', 'missing_tags')
 
     def validate(self, data):
         if 'ingredients' not in data:
@@ -218,20 +234,98 @@ class RecipeCreateUpdateSerializer(serializers.ModelSerializer):
 
         recipe = Recipe.objects.create(author=request.user, **validated_data)
         self.tags_ingredients_bulk_create(tags, ingredients, recipe)
+        Recipe.objects.filter(pk=recipe.pk).update_search_vector()
         return recipe
 
+    def update_tags(self, recipe, tags):
+        new = {tag['id'].pk for tag in tags}
+        existing = set(
+            TagInRecipe.objects.filter(recipe=recipe).values_list(
+                'tag_id',
+                flat=True,
+            ),
+        )
+        if existing - new:
+            TagInRecipe.objects.filter(
+                recipe=recipe,
+                tag_id__in=existing - new,
+            ).delete()
+        if new - existing:
+            TagInRecipe.objects.bulk_create(
+                TagInRecipe(tag_id=tag_id, recipe=recipe)
+                for tag_id in new - existing
+            )
+
+    def update_ingredients(self, recipe, ingredients):
+        new = {
+            ingredient['id'].pk: ingredient['amount']
+            for ingredient in ingredients
+        }
+        existing = {
+            row.ingredient_id: row
+            for row in AmountOfIngredientInRecipe.objects.filter(
+                recipe=recipe,
+            ).only('id', 'ingredient_id', 'amount')
+        }
+        removed = [
+            row.pk
+            for ingredient_id, row in existing.items()
+            if ingredient_id not in new
+        ]
+        changed = []
+        for ingredient_id, row in existing.items():
+            if ingredient_id in new and row.amount != new[ingredient_id]:
+                row.amount = new[ingredient_id]
+                changed.append(row)
+        added = [
+            AmountOfIngredientInRecipe(
+                ingredient_id=ingredient_id,
+                amount=amount,
+                recipe=recipe,
+            )
+            for ingredient_id, amount in new.items()
+            if ingredient_id not in existing
+        ]
+        if removed:
+            AmountOfIngredientInRecipe.objects.filter(pk__in=removed).delete()
+        if changed:
+            AmountOfIngredientInRecipe.objects.bulk_update(changed, ['amount'])
+        if added:
+            AmountOfIngredientInRecipe.objects.bulk_create(added)
+        return bool(removed or added), bool(removed or changed or added)
+
     def update(self, instance, validated_data):
         ingredients = validated_data.pop('ingredients')
         tags = validated_data.pop('tags')
-        instance = super().update(instance, validated_data)
-        instance.tags.clear()
-        instance.ingredients.clear()
-
-        recipe = get_object_or_404(Recipe, pk=instance.pk)
-        self.tags_ingredients_bulk_create(tags, ingredients, recipe)
-        return recipe
+        text_changed = any(
+            validated_data.get(field, getattr(instance, field))
+            != getattr(instance, field)
+            for field in ('name', 'text')
+        )
+        with transaction.atomic():
+            instance = super().update(instance, validated_data)
+            self.update_tags(instance, tags)
+            names_changed, amounts_changed = self.update_ingredients(
+                instance,
+                ingredients,
+            )
+            if text_changed or names_changed:
+                Recipe.objects.filter(pk=instance.pk).update_search_vector()
+        if amounts_changed:
+            invalidate_recipe_shopping_lists(instance)
+        bump_version('recipes')
+        return instance
 
     def to_representation(self, instance):
+        prefetch_related_objects(
+            [instance],
+            Prefetch(
+                'amount_of_ingredient',
+                queryset=AmountOfIngredientInRecipe.objects.select_related(
+                    'ingredient',
+                ),
+            ),
+        )
         recipe_data = super().to_representation(instance)
         recipe_data['ingredients'] = IngredientInRecipeSerializer(
             instance.amount_of_ingredient.all(),
@@ -253,29 +347,57 @@ class RecipeCreateUpdateSerializer(serializers.ModelSerializer):
         )
 
 
+class RecipeListSerializer(serializers.ListSerializer):
+    def to_representation(self, data):
+        recipes = list(data)
+        recipe_ids = [recipe.id for recipe in recipes]
+        self.context['short_links'] = dict(
+            zip(
+                recipe_ids,
+                get_short_links(self.context.get('request'), recipe_ids),
+            ),
+        )
+        return super().to_representation(recipes)
+
+
 class RecipeRetrieveSerializer(RecipeCreateUpdateSerializer):
     is_favorited = serializers.SerializerMethodField()
     is_in_shopping_cart = serializers.SerializerMethodField()
+    image_renditions = serializers.SerializerMethodField()
+
+    def get_image_renditions(self, obj):
+        return get_rendition_urls(obj.image, self.context.get('request'))
+
+    def get_recipe_state(self):
+        if 'recipe_state' not in self.context:
+            self.context['recipe_state'] = get_recipe_state(
+                self.context.get('request').user,
+            )
+        return self.context['recipe_state']
 
     def get_is_favorited(self, obj):
-        customer = self.context.get('request').user
-        if customer.is_authenticated:
-            return Favorite.objects.filter(
-                customer=customer,
-                recipe=obj,
-            ).exists()
-        return False
+        return self.get_recipe_state().is_favorited(obj.id)
 
     def get_is_in_shopping_cart(self, obj):
-        customer = self.context.get('request').user
-        if customer.is_authenticated:
-            return ShoppingCart.objects.filter(
-                customer=customer,
-                recipe=obj,
-            ).exists()
-        return False
+        return self.get_recipe_state().is_in_shopping_cart(obj.id)
+
+    def get_short_link(self, obj):
+        short_link = self.context.get('short_links', {}).get(obj.id)
+        if short_link is None:
+            short_link, = get_short_links(
+                self.context.get('request'),
+                [obj.id],
+            )
+        return short_link
+
+    def to_representation(self, instance):
+        instance.author.is_subscribed = instance.author_is_subscribed
+        representation = super().to_representation(instance)
+        representation['short-link'] = self.get_short_link(instance)
+        return representation
 
     class Meta(RecipeCreateUpdateSerializer.Meta):
+        list_serializer_class = RecipeListSerializer
         fields = (
             'id',
             'tags',
@@ -287,6 +409,7 @@ class RecipeRetrieveSerializer(RecipeCreateUpdateSerializer):
             'cooking_time',
             'is_favorited',
             'is_in_shopping_cart',
+            'image_renditions',
         )
 
 
@@ -327,17 +450,14 @@ class BaseSubscriptionSerializer(serializers.ModelSerializer):
     def get_recipes(self, obj):
         author = self.get_author(obj)
         queryset = Recipe.objects.filter(author=author.id)
-        recipes_limit = self.context['request'].query_params.get(
-            'recipes_limit',
-        )
-        if recipes_limit:
-            queryset = queryset[: int(recipes_limit)]
+        recipes_limit = self.context.get('recipes_limit')
+        if recipes_limit is not None:
+            queryset = queryset[:recipes_limit]
         serializer = RecipeMiniFieldSerializer(queryset, many=True)
         return serializer.data
 
     def get_recipes_count(self, obj):
-        author = self.get_author(obj)
-        return Recipe.objects.filter(author=author.id).count()
+        return self.get_author(obj).recipes_count
 
     def get_author(self, obj):
         try:
@@ -387,6 +507,15 @@ class SubscriptionCreateSerializer(BaseSubscriptionSerializer):
 
 
 class SubscriptionListSerializer(BaseSubscriptionSerializer):
+    def get_is_subscribed(self, obj):
+        return True
+
+    def get_recipes(self, obj):
+        return RecipeMiniFieldSerializer(
+            obj.author.preview_recipes,
+            many=True,
+        ).data
+
     class Meta(BaseSubscriptionSerializer.Meta):
         fields = (
             'email',
@@ -428,7 +557,7 @@ class ShoppingCartSerializer(serializers.ModelSerializer):
             serializers.UniqueTogetherValidator(
                 queryset=ShoppingCart.objects.all(),
                 fields=('customer', 'recipe'),
-                message='Рецепт уже добавлен в список покупок',
+                message=settings.ERROR_MESSAGES.get('shopping_cart_exists'),
             ),
         ]
         extra_kwargs = {
@@ -444,6 +573,21 @@ class FavoriteSerializer(ShoppingCartSerializer):
             serializers.UniqueTogetherValidator(
                 queryset=Favorite.objects.all(),
                 fields=('customer', 'recipe'),
-                message='Рецепт уже добавлен в избранное',
+                message=settings.ERROR_MESSAGES.get('favorite_exists'),
             ),
         ]
+
+
+class BulkIdsSerializer(serializers.Serializer):
+    ids = serializers.ListField(
+        child=serializers.IntegerField(min_value=1),
+        allow_empty=False,
+        max_length=settings.BULK_MAX_SIZE,
+    )
+
+    def validate_ids(self, value):
+        return list(dict.fromkeys(value))
+
+
+class RecipesLimitSerializer(serializers.Serializer):
+    recipes_limit = serializers.IntegerField(min_value=0, required=False)
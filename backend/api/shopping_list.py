@@ -0,0 +1,56 @@
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models import F, Sum
+
+from recipes.models import AmountOfIngredientInRecipe, ShoppingCart
+from .cache import bump_version, get_version
+
+CACHE_GROUP = 'shopping_list:{}'
+CACHE_KEY = 'shopping_list:{}:{}'
+
+
+def get_cache_group(customer_id):
+    return CACHE_GROUP.format(customer_id)
+
+
+def aggregate_shopping_list(customer):
+    return (
+        AmountOfIngredientInRecipe.objects.filter(
+            recipe__shopping_carts__customer=customer,
+        )
+        .values(
+            name=F('ingredient__name'),
+            measurement_unit=F('ingredient__measurement_unit'),
+        )
+        .annotate(total_amount=Sum('amount'))
+        .order_by('name')
+    )
+
+
+def iter_shopping_list(customer):
+    key = CACHE_KEY.format(
+        customer.id,
+        get_version(get_cache_group(customer.id)),
+    )
+    rows = cache.get(key)
+    if rows is not None:
+        yield from rows
+        return
+    rows = []
+    for row in aggregate_shopping_list(customer).iterator():
+        rows.append(row)
+        yield row
+    cache.add(key, rows, settings.SHOPPING_LIST_CACHE_TIMEOUT)
+
+
+def invalidate_shopping_list(*customer_ids):
+    bump_version(*map(get_cache_group, customer_ids))
+
+
+def invalidate_recipe_shopping_lists(recipe):
+    invalidate_shopping_list(
+        *ShoppingCart.objects.filter(recipe=recipe).values_list(
+            'customer_id',
+            flat=True,
+        ),
+    )
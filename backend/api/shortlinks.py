@@ -0,0 +1,184 @@
+import fcntl
+import logging
+import os
+import threading
+from collections import OrderedDict
+from contextlib import contextmanager
+from pathlib import Path
+
+from django.conf import settings
+from django.db import transaction
+from django.urls import reverse
+
+from recipes.models import Recipe
+from . import codec
+
+logger = logging.getLogger(__name__)
+
+RECIPE_PATH = '/recipes/{}/'
+MAP_LINE = '"{}" {};\n'
+TOMBSTONE_LINE = '"{}" 1;\n'
+
+
+def encode(recipe_id):
+    return codec.encode(recipe_id, settings.SHORTLINK_CHECKSUM)
+
+
+def encode_many(recipe_ids):
+    return codec.encode_many(recipe_ids, settings.SHORTLINK_CHECKSUM)
+
+
+def get_short_links(request, recipe_ids):
+    prefix, suffix = request.build_absolute_uri(
+        reverse('shortlink', kwargs={'encoded_id': '0'}),
+    ).rsplit('0', 1)
+    return [f'{prefix}{code}{suffix}' for code in encode_many(recipe_ids)]
+
+
+def get_codes(recipe_ids):
+    codes = [codec.encode_many(recipe_ids)]
+    if settings.SHORTLINK_CHECKSUM:
+        codes.append(encode_many(recipe_ids))
+    return [
+        (code, recipe_id)
+        for variant in codes
+        for code, recipe_id in zip(variant, recipe_ids)
+    ]
+
+
+def get_recipe_path(recipe_id):
+    return RECIPE_PATH.format(recipe_id)
+
+
+class LRUCache:
+    __slots__ = ('maxsize', 'items', 'lock')
+
+    def __init__(self, maxsize):
+        self.maxsize = maxsize
+        self.items = OrderedDict()
+        self.lock = threading.Lock()
+
+    def get(self, key):
+        with self.lock:
+            value = self.items.get(key)
+            if value is not None:
+                self.items.move_to_end(key)
+            return value
+
+    def set(self, key, value):
+        with self.lock:
+            self.items[key] = value
+            self.items.move_to_end(key)
+            if len(self.items) > self.maxsize:
+                self.items.popitem(last=False)
+
+    def discard(self, key):
+        with self.lock:
+            self.items.pop(key, None)
+
+    def clear(self):
+        with self.lock:
+            self.items.clear()
+
+
+paths = LRUCache(settings.SHORTLINK_CACHE_SIZE)
+
+
+def resolve(code):
+    path = paths.get(code)
+    if path is not None:
+        return path
+    recipe_id = codec.decode(code)
+    if not Recipe.objects.filter(pk=recipe_id).exists():
+        return None
+    path = get_recipe_path(recipe_id)
+    paths.set(code, path)
+    return path
+
+
+def forget(recipe_id):
+    for code, _ in get_codes([recipe_id]):
+        paths.discard(code)
+
+
+def get_map_lines(recipe_ids):
+    return [
+        MAP_LINE.format(code, get_recipe_path(recipe_id))
+        for code, recipe_id in get_codes(recipe_ids)
+    ]
+
+
+@contextmanager
+def locked_map():
+    path = Path(settings.SHORTLINK_MAP_FILE)
+    with open(path.with_suffix('.lock'), 'w') as lock:
+        fcntl.flock(lock, fcntl.LOCK_EX)
+        yield path
+
+
+def write_map(path, lines):
+    temporary = path.with_suffix('.tmp')
+    with open(temporary, 'w', encoding='ascii') as file:
+        file.writelines(lines)
+    os.replace(temporary, path)
+
+
+def get_tombstones_path(path):
+    return path.with_suffix('.deleted')
+
+
+def write_full_map(path):
+    write_map(
+        path,
+        get_map_lines(
+            list(Recipe.objects.order_by('pk').values_list('pk', flat=True)),
+        ),
+    )
+    get_tombstones_path(path).unlink(missing_ok=True)
+
+
+def export_map():
+    with locked_map() as path:
+        write_full_map(path)
+    return path
+
+
+def add_to_map(recipe_id):
+    with locked_map() as path:
+        if not path.is_file():
+            write_full_map(path)
+            return
+        with open(path, 'a', encoding='ascii') as file:
+            file.writelines(get_map_lines([recipe_id]))
+
+
+def remove_from_map(recipe_id):
+    with locked_map() as path:
+        if not path.is_file():
+            return
+        with open(get_tombstones_path(path), 'a+', encoding='ascii') as file:
+            file.writelines(
+                TOMBSTONE_LINE.format(code)
+                for code, _ in get_codes([recipe_id])
+            )
+            file.seek(0)
+            tombstones = sum(1 for _ in file)
+        if tombstones >= settings.SHORTLINK_MAP_COMPACT_AFTER:
+            write_full_map(path)
+
+
+def update_map_safely(function, recipe_id):
+    try:
+        function(recipe_id)
+    except OSError:
+        logger.exception(
+            'Не удалось обновить карту коротких ссылок для рецепта %s',
+            recipe_id,
+        )
+
+
+def schedule_map_update(function, recipe_id):
+    if settings.SHORTLINK_MAP_FILE:
+        transaction.on_commit(
+            lambda: update_map_safely(function, recipe_id),
+        )
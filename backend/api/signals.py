@@ -0,0 +1,101 @@
+from django.contrib.auth import get_user_model
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from recipes.models import (
+    Favorite,
+    Ingredient,
+    Recipe,
+    ShoppingCart,
+    Subscription,
+    Tag,
+)
+from recipes.signals import relations_changed
+from rest_framework.authtoken.models import Token
+
+from .authentication import invalidate_token, invalidate_user_tokens
+from .cache import bump_version
+from .images import schedule_renditions
+from .ingredient_index import ingredient_index
+from .recipe_state import invalidate_recipe_state
+from .shopping_list import invalidate_shopping_list
+from .shortlinks import (
+    add_to_map,
+    forget,
+    remove_from_map,
+    schedule_map_update,
+)
+
+User = get_user_model()
+
+
+@receiver(post_save, sender=ShoppingCart)
+@receiver(post_delete, sender=ShoppingCart)
+def shopping_cart_changed(sender, instance, **kwargs):
+    invalidate_shopping_list(instance.customer_id)
+    invalidate_recipe_state(instance.customer_id)
+    bump_version(f'user:{instance.customer_id}')
+
+
+@receiver(post_save, sender=Favorite)
+@receiver(post_delete, sender=Favorite)
+def favorite_changed(sender, instance, **kwargs):
+    invalidate_recipe_state(instance.customer_id)
+    bump_version(f'user:{instance.customer_id}')
+
+
+@receiver(post_save, sender=Subscription)
+@receiver(post_delete, sender=Subscription)
+def subscription_changed(sender, instance, **kwargs):
+    bump_version(f'user:{instance.subscriber_id}')
+
+
+@receiver(relations_changed)
+def relations_bulk_changed(sender, owner_id, **kwargs):
+    if sender is ShoppingCart:
+        invalidate_shopping_list(owner_id)
+    if sender in (ShoppingCart, Favorite):
+        invalidate_recipe_state(owner_id)
+    bump_version(f'user:{owner_id}')
+
+
+@receiver(post_save, sender=Ingredient)
+@receiver(post_delete, sender=Ingredient)
+def ingredient_changed(sender, **kwargs):
+    ingredient_index.invalidate()
+    bump_version('ingredients')
+
+
+@receiver(post_save, sender=Tag)
+@receiver(post_delete, sender=Tag)
+def tag_changed(sender, **kwargs):
+    bump_version('tags', 'recipes')
+
+
+@receiver(post_save, sender=Recipe)
+def recipe_saved(sender, instance, created, **kwargs):
+    schedule_renditions(instance.image)
+    if created:
+        schedule_map_update(add_to_map, instance.pk)
+    bump_version('recipes')
+
+
+@receiver(post_delete, sender=Recipe)
+def recipe_deleted(sender, instance, **kwargs):
+    forget(instance.pk)
+    schedule_map_update(remove_from_map, instance.pk)
+    bump_version('recipes')
+
+
+@receiver(post_save, sender=User)
+def user_saved(sender, instance, update_fields=None, **kwargs):
+    invalidate_user_tokens(instance.pk)
+    if update_fields is None or 'avatar' in update_fields:
+        schedule_renditions(instance.avatar)
+    if update_fields is None or set(update_fields) != {'last_login'}:
+        bump_version('recipes')
+
+
+@receiver(post_delete, sender=Token)
+def token_deleted(sender, instance, **kwargs):
+    invalidate_token(instance.key)
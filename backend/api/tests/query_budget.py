@@ -0,0 +1,507 @@
+import base64
+import json
+import random
+import tempfile
+from collections import namedtuple
+from contextlib import contextmanager
+from pathlib import Path
+
+from django.contrib.auth import get_user_model
+from django.contrib.auth.tokens import default_token_generator
+from django.core.cache import cache
+from django.db import connection, transaction
+from django.test.utils import override_settings, setup_test_environment
+from django.urls import URLResolver, reverse
+from djoser.utils import encode_uid
+from rest_framework.authtoken.models import Token
+from rest_framework.test import APIClient
+
+from recipes.dataset import IMAGE, PASSWORD, create_dataset, plan_links
+from recipes.models import Ingredient, Recipe, Tag
+from recipes.popularity import refresh_popularity
+from .. import shortlinks, urls
+from ..ingredient_index import ingredient_index
+from ..request_stats import RequestStats
+from .utils import PREFIX
+
+User = get_user_model()
+
+BUDGET_FILE = Path(__file__).resolve().parent / 'query_budget.json'
+NEW_PASSWORD = 'Budget-password-2'
+MISSING_EMAIL = f'{PREFIX}missing@example.com'
+IMAGE_DATA = 'data:image/png;base64,' + base64.b64encode(IMAGE).decode()
+SKIPPED_NAMES = ('api-root',)
+IGNORED_METHODS = ('head', 'options')
+RECIPES_LIMIT = 3
+ACTOR, AUTHOR, OTHER = range(3)
+
+Size = namedtuple('Size', ('users', 'rows'))
+Route = namedtuple('Route', ('method', 'name'))
+Scenario = namedtuple(
+    'Scenario',
+    ('kwargs', 'data', 'anonymous', 'status'),
+    defaults=(None, None, False, None),
+)
+
+SIZES = {
+    'small': Size(users=6, rows=2),
+    'full_page': Size(users=12, rows=6),
+    'paged': Size(users=24, rows=14),
+}
+
+
+def get_methods(callback):
+    actions = getattr(callback, 'actions', None)
+    view_class = callback.cls
+    if actions is None:
+        return [
+            method
+            for method in view_class.http_method_names
+            if method not in IGNORED_METHODS and hasattr(view_class, method)
+        ]
+    return [
+        method
+        for method in actions
+        if method not in IGNORED_METHODS
+        and method in view_class.http_method_names
+    ]
+
+
+def get_routes(patterns=None):
+    routes = {}
+    for pattern in urls.urlpatterns if patterns is None else patterns:
+        if isinstance(pattern, URLResolver):
+            for route in get_routes(pattern.url_patterns):
+                routes[route] = None
+            continue
+        if pattern.name in SKIPPED_NAMES or not hasattr(
+            pattern.callback,
+            'cls',
+        ):
+            continue
+        for method in get_methods(pattern.callback):
+            routes[Route(method, pattern.name)] = None
+    return list(routes)
+
+
+def get_route_key(route):
+    return f'{route.method.upper()} {route.name}'
+
+
+def load_budget(path=BUDGET_FILE):
+    if not path.is_file():
+        return {}
+    with open(path, encoding='utf-8') as file:
+        return json.load(file)
+
+
+def save_budget(budget, path=BUDGET_FILE):
+    with open(path, 'w', encoding='utf-8') as file:
+        json.dump(dict(sorted(budget.items())), file, indent=2)
+        file.write('\n')
+
+
+def plan_others(rng, size, targets, **kwargs):
+    return [
+        link
+        for link in plan_links(rng, size.users, targets, size.rows, **kwargs)
+        if link[0] != ACTOR
+    ]
+
+
+def plan_fixtures(rng, size):
+    rows = size.rows
+    recipe_authors = [
+        *[ACTOR] * rows,
+        *[AUTHOR] * rows * 3,
+        *[author for author in range(OTHER, size.users) for _ in range(rows)],
+    ]
+    favorites = plan_others(rng, size, len(recipe_authors))
+    shopping_carts = plan_others(rng, size, len(recipe_authors))
+    subscriptions = plan_others(rng, size, size.users, allow_self=False)
+    favorites += [(ACTOR, recipe) for recipe in range(rows, rows * 2)]
+    shopping_carts += [
+        (ACTOR, recipe) for recipe in range(rows * 2, rows * 3)
+    ]
+    subscriptions += [
+        (ACTOR, author) for author in range(OTHER + 1, OTHER + 1 + rows)
+    ]
+    return recipe_authors, favorites, shopping_carts, subscriptions
+
+
+def get_fixtures(size):
+    rows = size.rows
+    rng = random.Random(0)
+    create_dataset(rng, size.users, *plan_fixtures(rng, size), prefix=PREFIX)
+    actor, author, other, *authors = User.objects.filter(
+        username__startswith=PREFIX,
+    ).order_by('pk')
+    own, favorites, carts, free = (
+        list(
+            Recipe.objects.filter(author=user)
+            .order_by('pk')
+            .values_list('pk', flat=True)[start:start + rows],
+        )
+        for user, start in (
+            (actor, 0),
+            (author, 0),
+            (author, rows),
+            (author, rows * 2),
+        )
+    )
+    subscribed = [user.pk for user in authors[:rows]]
+    inactive = User.objects.create_user(
+        username=f'{PREFIX}inactive',
+        email=f'{PREFIX}inactive@example.com',
+        first_name='Неактивный',
+        last_name='Пользователь',
+        password=PASSWORD,
+        is_active=False,
+    )
+    ingredient_ids = list(
+        Ingredient.objects.order_by('pk').values_list('pk', flat=True),
+    )
+    tag_ids = list(Tag.objects.order_by('pk').values_list('pk', flat=True))
+    refresh_popularity()
+    return {
+        'actor': actor,
+        'token': Token.objects.get_or_create(user=actor)[0].key,
+        'other': other,
+        'inactive': inactive,
+        'own': own,
+        'favorites': favorites,
+        'carts': carts,
+        'free': free,
+        'subscribed': subscribed,
+        'unsubscribed': [user.pk for user in authors[rows:]] + [other.pk],
+        'ingredients': ingredient_ids[:rows],
+        'tags': tag_ids[:rows],
+        'tag_slugs': list(
+            Tag.objects.filter(pk__in=tag_ids[:rows]).values_list(
+                'slug',
+                flat=True,
+            ),
+        ),
+    }
+
+
+def get_recipe_data(fixtures):
+    return {
+        'name': 'Новый рецепт',
+        'text': 'Текст',
+        'cooking_time': 15,
+        'image': IMAGE_DATA,
+        'tags': fixtures['tags'],
+        'ingredients': [
+            {'id': pk, 'amount': 50} for pk in fixtures['ingredients']
+        ],
+    }
+
+
+def get_uid_and_token(user):
+    return {
+        'uid': encode_uid(user.pk),
+        'token': default_token_generator.make_token(user),
+    }
+
+
+SCENARIOS = {
+    Route('get', 'ingredient-list'): lambda fixtures: Scenario(
+        data={'name': 'ин'},
+    ),
+    Route('get', 'ingredient-detail'): lambda fixtures: Scenario(
+        kwargs={'pk': fixtures['ingredients'][0]},
+    ),
+    Route('get', 'tag-list'): lambda fixtures: Scenario(),
+    Route('get', 'tag-detail'): lambda fixtures: Scenario(
+        kwargs={'pk': fixtures['tags'][0]},
+    ),
+    Route('get', 'recipe-list'): lambda fixtures: Scenario(
+        data={'tags': fixtures['tag_slugs']},
+    ),
+    Route('post', 'recipe-list'): lambda fixtures: Scenario(
+        data=get_recipe_data(fixtures),
+    ),
+    Route('post', 'recipe-favorite-bulk'): lambda fixtures: Scenario(
+        data={'ids': fixtures['free']},
+    ),
+    Route('delete', 'recipe-favorite-bulk'): lambda fixtures: Scenario(
+        data={'ids': fixtures['favorites']},
+    ),
+    Route('post', 'recipe-shopping_cart-bulk'): lambda fixtures: Scenario(
+        data={'ids': fixtures['free']},
+    ),
+    Route('delete', 'recipe-shopping_cart-bulk'): lambda fixtures: Scenario(
+        data={'ids': fixtures['carts']},
+    ),
+    Route('get', 'recipe-download_shopping_cart'): lambda fixtures: (
+        Scenario()
+    ),
+    Route('get', 'recipe-trending'): lambda fixtures: Scenario(),
+    Route('get', 'recipe-detail'): lambda fixtures: Scenario(
+        kwargs={'pk': fixtures['own'][0]},
+    ),
+    Route('patch', 'recipe-detail'): lambda fixtures: Scenario(
+        kwargs={'pk': fixtures['own'][0]},
+        data={
+            **get_recipe_data(fixtures),
+            'ingredients': [
+                {'id': pk, 'amount': 75} for pk in fixtures['ingredients']
+            ],
+        },
+    ),
+    Route('delete', 'recipe-detail'): lambda fixtures: Scenario(
+        kwargs={'pk': fixtures['own'][0]},
+    ),
+    Route('post', 'recipe-favorite'): lambda fixtures: Scenario(
+        kwargs={'pk': fixtures['free'][0]},
+    ),
+    Route('delete', 'recipe-favorite'): lambda fixtures: Scenario(
+        kwargs={'pk': fixtures['favorites'][0]},
+    ),
+    Route('get', 'recipe-get-link'): lambda fixtures: Scenario(
+        kwargs={'pk': fixtures['own'][0]},
+    ),
+    Route('post', 'recipe-shopping_cart'): lambda fixtures: Scenario(
+        kwargs={'pk': fixtures['free'][0]},
+    ),
+    Route('delete', 'recipe-shopping_cart'): lambda fixtures: Scenario(
+        kwargs={'pk': fixtures['carts'][0]},
+    ),
+    Route('get', 'customuser-list'): lambda fixtures: Scenario(),
+    Route('post', 'customuser-list'): lambda fixtures: Scenario(
+        data={
+            'email': f'{PREFIX}new@example.com',
+            'username': f'{PREFIX}new',
+            'first_name': 'Новый',
+            'last_name': 'Пользователь',
+            'password': NEW_PASSWORD,
+        },
+        anonymous=True,
+    ),
+    Route('post', 'customuser-activation'): lambda fixtures: Scenario(
+        data=get_uid_and_token(fixtures['inactive']),
+        anonymous=True,
+    ),
+    Route('post', 'customuser-resend-activation'): lambda fixtures: Scenario(
+        data={'email': fixtures['inactive'].email},
+        anonymous=True,
+        status=400,
+    ),
+    Route('post', 'customuser-reset-password'): lambda fixtures: Scenario(
+        data={'email': MISSING_EMAIL},
+        anonymous=True,
+    ),
+    Route('post', 'customuser-reset-password-confirm'): lambda fixtures: (
+        Scenario(
+            data={
+                **get_uid_and_token(fixtures['actor']),
+                'new_password': NEW_PASSWORD,
+            },
+            anonymous=True,
+        )
+    ),
+    Route('post', 'customuser-reset-username'): lambda fixtures: Scenario(
+        data={'email': MISSING_EMAIL},
+        anonymous=True,
+    ),
+    Route('post', 'customuser-reset-username-confirm'): lambda fixtures: (
+        Scenario(
+            data=get_uid_and_token(fixtures['actor']),
+            anonymous=True,
+            status=400,
+        )
+    ),
+    Route('post', 'customuser-set-password'): lambda fixtures: Scenario(
+        data={'current_password': PASSWORD, 'new_password': NEW_PASSWORD},
+    ),
+    Route('post', 'customuser-set-username'): lambda fixtures: Scenario(
+        data={'current_password': PASSWORD},
+        status=400,
+    ),
+    Route('get', 'customuser-me'): lambda fixtures: Scenario(),
+    Route('put', 'customuser-me'): lambda fixtures: Scenario(
+        data={
+            'email': fixtures['actor'].email,
+            'username': fixtures['actor'].username,
+            'first_name': 'Имя',
+            'last_name': 'Фамилия',
+        },
+    ),
+    Route('patch', 'customuser-me'): lambda fixtures: Scenario(
+        data={'first_name': 'Имя'},
+    ),
+    Route('delete', 'customuser-me'): lambda fixtures: Scenario(
+        data={'current_password': PASSWORD},
+    ),
+    Route('post', 'customuser-subscribe-bulk'): lambda fixtures: Scenario(
+        data={'ids': fixtures['unsubscribed']},
+    ),
+    Route('delete', 'customuser-subscribe-bulk'): lambda fixtures: Scenario(
+        data={'ids': fixtures['subscribed']},
+    ),
+    Route('get', 'customuser-subscriptions'): lambda fixtures: Scenario(
+        data={'recipes_limit': RECIPES_LIMIT},
+    ),
+    Route('get', 'customuser-detail'): lambda fixtures: Scenario(
+        kwargs={'id': fixtures['other'].pk},
+    ),
+    Route('put', 'customuser-detail'): lambda fixtures: Scenario(
+        kwargs={'id': fixtures['actor'].pk},
+        data={
+            'email': fixtures['actor'].email,
+            'username': fixtures['actor'].username,
+            'first_name': 'Имя',
+            'last_name': 'Фамилия',
+        },
+    ),
+    Route('patch', 'customuser-detail'): lambda fixtures: Scenario(
+        kwargs={'id': fixtures['actor'].pk},
+        data={'first_name': 'Имя'},
+    ),
+    Route('delete', 'customuser-detail'): lambda fixtures: Scenario(
+        kwargs={'id': fixtures['actor'].pk},
+        data={'current_password': PASSWORD},
+    ),
+    Route('post', 'customuser-subscribe'): lambda fixtures: Scenario(
+        kwargs={'id': fixtures['other'].pk},
+    ),
+    Route('delete', 'customuser-subscribe'): lambda fixtures: Scenario(
+        kwargs={'id': fixtures['subscribed'][0]},
+    ),
+    Route('post', 'login'): lambda fixtures: Scenario(
+        data={'email': fixtures['actor'].email, 'password': PASSWORD},
+        anonymous=True,
+    ),
+    Route('post', 'logout'): lambda fixtures: Scenario(),
+    Route('put', 'avatar'): lambda fixtures: Scenario(
+        data={'avatar': IMAGE_DATA},
+    ),
+    Route('delete', 'avatar'): lambda fixtures: Scenario(),
+}
+
+
+def get_missing_scenarios(routes):
+    return [
+        get_route_key(route) for route in routes if route not in SCENARIOS
+    ]
+
+
+def send(route, scenario, token):
+    client = APIClient(raise_request_exception=False)
+    if not scenario.anonymous:
+        client.credentials(HTTP_AUTHORIZATION=f'Token {token}')
+    path = reverse(route.name, kwargs=scenario.kwargs)
+    if route.method == 'get':
+        response = client.get(path, scenario.data)
+    else:
+        response = getattr(client, route.method)(
+            path,
+            scenario.data,
+            format='json',
+        )
+    if response.streaming:
+        b''.join(response.streaming_content)
+    return response
+
+
+def count_queries(routes, size):
+    counts = {}
+    errors = []
+    with transaction.atomic():
+        fixtures = get_fixtures(size)
+        for route in routes:
+            scenario = SCENARIOS[route](fixtures)
+            cache.clear()
+            shortlinks.paths.clear()
+            ingredient_index.reset()
+            savepoint = transaction.savepoint()
+            stats = RequestStats()
+            with connection.execute_wrapper(stats):
+                response = send(route, scenario, fixtures['token'])
+            transaction.savepoint_rollback(savepoint)
+            expected = scenario.status
+            if (
+                response.status_code >= 400 if expected is None
+                else response.status_code != expected
+            ):
+                errors.append(
+                    f'{get_route_key(route)}: ответ {response.status_code}',
+                )
+            counts[get_route_key(route)] = stats.queries
+        transaction.set_rollback(True)
+    return counts, errors
+
+
+@contextmanager
+def isolated_settings():
+    with tempfile.TemporaryDirectory() as media_root:
+        with override_settings(
+            CACHES={
+                'default': {
+                    'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+                    'LOCATION': 'query-budget',
+                },
+            },
+            MEDIA_ROOT=media_root,
+            SHORTLINK_MAP_FILE='',
+            REQUEST_STATS=False,
+        ):
+            yield
+
+
+def measure_routes(routes):
+    with isolated_settings():
+        return {
+            name: count_queries(routes, size) for name, size in SIZES.items()
+        }
+
+
+def get_budget(results):
+    counts = [found for found, _ in results.values()]
+    return {key: max(count[key] for count in counts) for key in counts[0]}
+
+
+def check_budget(routes, results, budget, update=False):
+    counts = [results[name][0] for name in SIZES]
+    errors = [error for _, found in results.values() for error in found]
+    lines = []
+    for route in routes:
+        key = get_route_key(route)
+        found = [count[key] for count in counts]
+        limit = budget.get(key)
+        lines.append(
+            f'{key}: {" / ".join(map(str, found))} '
+            f'(бюджет {"—" if limit is None else limit})',
+        )
+        if max(found) > found[0]:
+            errors.append(f'{key}: число запросов растёт с данными')
+        if not update and limit is None:
+            errors.append(f'{key}: нет бюджета')
+        elif not update and max(found) > limit:
+            errors.append(f'{key}: превышен бюджет ({limit})')
+    stale = sorted(set(budget) - set(counts[0]))
+    if stale and not update:
+        errors.append(
+            'В бюджете есть несуществующие маршруты: ' + ', '.join(stale),
+        )
+    return lines, errors
+
+
+def measure_in_test_db(routes, keepdb=False):
+    setup_test_environment()
+    old_name = connection.settings_dict['NAME']
+    connection.creation.create_test_db(
+        verbosity=0,
+        autoclobber=True,
+        serialize=False,
+        keepdb=keepdb,
+    )
+    try:
+        return measure_routes(routes)
+    finally:
+        connection.creation.destroy_test_db(
+            old_name,
+            verbosity=0,
+            keepdb=keepdb,
+        )
@@ -0,0 +1,106 @@
+import shutil
+import tempfile
+
+from django.db import connection
+from django.test import override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from rest_framework import exceptions
+from rest_framework.authtoken.models import Token
+from rest_framework.test import APIRequestFactory
+
+from recipes.models import Subscription
+from ..authentication import CachedTokenAuthentication
+from .utils import DatasetTestCase
+
+LOCMEM = 'django.core.cache.backends.locmem.LocMemCache'
+FILE = 'django.core.cache.backends.filebased.FileBasedCache'
+
+
+def get_worker(backend, location):
+    return override_settings(
+        CACHES={'default': {'BACKEND': backend, 'LOCATION': location}},
+    )
+
+
+class CachedTokenAuthenticationTest(DatasetTestCase):
+    dataset = {'users': 3, 'recipes': 2, 'subscriptions': 0}
+
+    def setUp(self):
+        super().setUp()
+        self.cache_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.cache_dir, ignore_errors=True)
+        worker = get_worker(FILE, self.cache_dir)
+        worker.enable()
+        self.addCleanup(worker.disable)
+
+    def get_key(self, user):
+        return Token.objects.get_or_create(user=user)[0].key
+
+    def authenticate(self, key):
+        request = APIRequestFactory().get(
+            '/',
+            HTTP_AUTHORIZATION=f'Token {key}',
+        )
+        user, _ = CachedTokenAuthentication().authenticate(request)
+        return user
+
+    def count_queries(self, key):
+        with CaptureQueriesContext(connection) as queries:
+            self.authenticate(key)
+        return len(queries)
+
+    def assert_rejected(self, key):
+        with self.assertRaises(exceptions.AuthenticationFailed):
+            self.authenticate(key)
+
+    def test_counters_are_not_cached(self):
+        author, reader, _ = self.users
+        key = self.get_key(author)
+        self.authenticate(key)
+        Subscription.objects.create(subscriber=reader, author=author)
+        user = self.authenticate(key)
+        self.assertTrue(
+            set(author.counter_fields) <= user.get_deferred_fields(),
+        )
+        self.assertEqual(user.subscribers_count, 1)
+
+    def test_save_from_cached_user_keeps_counters(self):
+        author, reader, _ = self.users
+        client = self.get_client(author)
+        self.assertEqual(
+            client.get(reverse('customuser-me')).status_code,
+            200,
+        )
+        Subscription.objects.create(subscriber=reader, author=author)
+        self.assertEqual(client.delete(reverse('avatar')).status_code, 204)
+        author.refresh_from_db()
+        self.assertEqual(author.subscribers_count, 1)
+
+    def test_revocation_reaches_other_worker_with_shared_cache(self):
+        keys = [self.get_key(user) for user in self.users[:2]]
+        with get_worker(FILE, self.cache_dir):
+            for key in keys:
+                self.authenticate(key)
+            self.assertEqual(self.count_queries(keys[0]), 0)
+        with get_worker(FILE, self.cache_dir):
+            Token.objects.filter(key=keys[0]).delete()
+            self.users[1].is_active = False
+            self.users[1].save()
+        with get_worker(FILE, self.cache_dir):
+            for key in keys:
+                self.assert_rejected(key)
+
+    def test_local_cache_is_not_used(self):
+        keys = [self.get_key(user) for user in self.users[:2]]
+        with get_worker(LOCMEM, 'worker-a'):
+            for key in keys:
+                self.authenticate(key)
+            self.assertGreater(self.count_queries(keys[0]), 0)
+        with get_worker(LOCMEM, 'worker-b'):
+            Token.objects.filter(key=keys[0]).delete()
+            self.users[1].is_active = False
+            self.users[1].save()
+        with get_worker(LOCMEM, 'worker-a'):
+            for key in keys:
+                self.assert_rejected(key)
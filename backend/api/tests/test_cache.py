@@ -0,0 +1,46 @@
+from django.core.cache import cache
+from django.test import override_settings
+from django.urls import reverse
+
+from recipes.models import Recipe
+from ..cache import VERSION_KEY, bump_version, get_version
+from .utils import DatasetTestCase
+
+
+@override_settings(ALLOWED_HOSTS=['testserver', 'mirror.example.com'])
+class VersionedCacheTest(DatasetTestCase):
+    dataset = {'users': 2, 'recipes': 1}
+
+    def test_version_does_not_repeat_after_eviction(self):
+        seen = {get_version('tags')}
+        for _ in range(3):
+            bump_version('tags')
+            seen.add(get_version('tags'))
+            cache.delete(VERSION_KEY.format('tags'))
+            version = get_version('tags')
+            self.assertNotIn(version, seen)
+            seen.add(version)
+
+    def test_etag_depends_on_host_and_scheme(self):
+        client = self.get_client()
+        path = reverse('tag-list')
+        etags = {
+            client.get(path, **headers)['ETag']
+            for headers in (
+                {},
+                {'HTTP_HOST': 'mirror.example.com'},
+                {'secure': True},
+            )
+        }
+        self.assertEqual(len(etags), 3)
+
+    def test_response_is_not_shared_between_hosts(self):
+        client = self.get_client()
+        path = reverse(
+            'recipe-detail',
+            args=[Recipe.objects.values_list('pk', flat=True).first()],
+        )
+        first = client.get(path)
+        second = client.get(path, HTTP_HOST='mirror.example.com')
+        self.assertIn('//testserver/', first.data['short-link'])
+        self.assertIn('//mirror.example.com/', second.data['short-link'])
@@ -0,0 +1,138 @@
+import base64
+import math
+import os
+import textwrap
+import tracemalloc
+from io import BytesIO
+
+from django.conf import settings
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.test import SimpleTestCase, override_settings
+from django.test.client import BOUNDARY, MULTIPART_CONTENT, encode_multipart
+from django.urls import reverse
+from PIL import Image
+from rest_framework.exceptions import ValidationError
+from rest_framework.test import APIRequestFactory, force_authenticate
+
+from recipes.dataset import IMAGE
+from ..fields import Base64ImageField, iter_base64_chunks
+from ..views import UserMeAvatarAPIView
+from .utils import DatasetTestCase
+
+PREFIX = 'data:image/png;base64,'
+PEAK_LIMIT = 1024 * 1024
+LIMIT_MARGIN = 256 * 1024
+
+
+def get_peak(call):
+    tracemalloc.start()
+    try:
+        result = call()
+        return result, tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+
+def get_large_png():
+    side = math.isqrt((settings.IMAGE_UPLOAD_MAX_SIZE - LIMIT_MARGIN) // 3)
+    buffer = BytesIO()
+    Image.frombytes('RGB', (side, side), os.urandom(side * side * 3)).save(
+        buffer, format='PNG', compress_level=0,
+    )
+    return buffer.getvalue()
+
+
+class Base64ImageFieldTest(SimpleTestCase):
+    content = IMAGE + os.urandom(200 * 1024)
+
+    def decode(self, encoded):
+        file = Base64ImageField().decode(PREFIX + encoded)
+        self.assertEqual(file.name, 'image.png')
+        self.assertEqual(file.size, len(self.content))
+        return file.read()
+
+    def test_plain(self):
+        encoded = base64.b64encode(self.content).decode()
+        self.assertEqual(self.decode(encoded), self.content)
+
+    def test_whitespace(self):
+        encoded = base64.b64encode(self.content).decode()
+        for separator in ('\n', '\r\n', ' ', '\t'):
+            with self.subTest(separator=repr(separator)):
+                self.assertEqual(
+                    self.decode(separator.join(textwrap.wrap(encoded, 77))),
+                    self.content,
+                )
+
+    def test_chunks_keep_leftover(self):
+        encoded = ' \n'.join(
+            textwrap.wrap(base64.b64encode(self.content).decode(), 5),
+        )
+        for size in (1, 3, 7, 1000):
+            with self.subTest(size=size):
+                self.assertEqual(
+                    b''.join(iter_base64_chunks(encoded, 0, size)),
+                    self.content,
+                )
+
+    def test_invalid(self):
+        truncated = base64.b64encode(IMAGE).decode()[:-3]
+        for encoded in ('', 'bm90IGFuIGltYWdl', truncated):
+            with self.subTest(encoded=encoded):
+                with self.assertRaises(ValidationError):
+                    Base64ImageField().decode(PREFIX + encoded)
+
+    @override_settings(IMAGE_UPLOAD_MAX_SIZE=100 * 1024)
+    def test_too_large(self):
+        with self.assertRaises(ValidationError):
+            self.decode(base64.b64encode(self.content).decode())
+
+
+class UploadMemoryTest(SimpleTestCase):
+    content = get_large_png()
+
+    def test_size_near_limit(self):
+        self.assertLess(len(self.content), settings.IMAGE_UPLOAD_MAX_SIZE)
+        self.assertGreater(
+            len(self.content),
+            settings.IMAGE_UPLOAD_MAX_SIZE - LIMIT_MARGIN,
+        )
+
+    def test_base64_peak(self):
+        data = PREFIX + base64.b64encode(self.content).decode()
+        file, peak = get_peak(lambda: Base64ImageField().decode(data))
+        self.assertEqual(file.size, len(self.content))
+        self.assertLess(peak, PEAK_LIMIT)
+        file.close()
+
+
+class AvatarUploadMemoryTest(DatasetTestCase):
+    dataset = {'users': 1, 'recipes': 0}
+
+    def put_avatar(self, content):
+        request = APIRequestFactory().put(
+            reverse('avatar'),
+            encode_multipart(
+                BOUNDARY,
+                {'avatar': SimpleUploadedFile('avatar.png', content)},
+            ),
+            content_type=MULTIPART_CONTENT,
+        )
+        force_authenticate(request, self.users[0])
+        self.addCleanup(request.close)
+        Image.init()
+        return get_peak(
+            lambda: UserMeAvatarAPIView.as_view()(request).render(),
+        )
+
+    def test_multipart_peak(self):
+        response, peak = self.put_avatar(UploadMemoryTest.content)
+        self.assertEqual(response.status_code, 200)
+        self.assertLess(peak, PEAK_LIMIT)
+
+    @override_settings(IMAGE_UPLOAD_MAX_SIZE=1024 * 1024)
+    def test_multipart_too_large(self):
+        response, peak = self.put_avatar(UploadMemoryTest.content)
+        self.assertEqual(response.status_code, 400)
+        self.assertIn('avatar', response.data)
+        self.assertLess(peak, PEAK_LIMIT)
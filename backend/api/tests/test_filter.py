@@ -0,0 +1,136 @@
+from django.contrib.auth import get_user_model
+from django.db import connection
+from django.test import override_settings
+from rest_framework.request import Request
+from rest_framework.test import APIRequestFactory, force_authenticate
+
+from recipes.models import Favorite, Recipe, ShoppingCart, Tag, TagInRecipe
+from ..cache import bump_version
+from ..filter import RecipeFilterBackend, get_tag_ids
+from .utils import DatasetTestCase
+
+User = get_user_model()
+
+LINK_TABLES = {
+    model._meta.db_table for model in (Favorite, ShoppingCart, TagInRecipe)
+}
+DEDUPLICATING_NODES = ('Aggregate', 'Unique')
+
+
+def iter_nodes(node):
+    yield node
+    for child in node.get('Plans', ()):
+        yield from iter_nodes(child)
+
+
+class RecipeFilterPlanTest(DatasetTestCase):
+    dataset = {'users': 20, 'recipes': 5, 'favorites': 10, 'shopping_carts': 5}
+
+    def setUp(self):
+        super().setUp()
+        self.set_seqscan('off')
+        self.addCleanup(self.set_seqscan, 'on')
+
+    def set_seqscan(self, value):
+        with connection.cursor() as cursor:
+            cursor.execute(f'SET enable_seqscan = {value}')
+
+    def filter(self, user, params):
+        request = APIRequestFactory().get('/api/recipes/', params)
+        force_authenticate(request, user)
+        return RecipeFilterBackend().filter_queryset(
+            Request(request),
+            Recipe.objects.all(),
+            None,
+        )
+
+    def get_plan(self, queryset):
+        sql, params = queryset.query.sql_with_params()
+        with connection.cursor() as cursor:
+            cursor.execute(f'EXPLAIN (FORMAT JSON) {sql}', params)
+            (plan,), = cursor.fetchone()
+        return plan['Plan']
+
+    def assert_plan(self, queryset, expected_ids):
+        self.assertFalse(queryset.query.distinct)
+        self.assertEqual(
+            {alias.table_name for alias in queryset.query.alias_map.values()},
+            {Recipe._meta.db_table},
+        )
+        for node in iter_nodes(self.get_plan(queryset)):
+            if node.get('Relation Name') in LINK_TABLES:
+                self.assertNotEqual(node['Node Type'], 'Seq Scan', node)
+            if node['Node Type'] in DEDUPLICATING_NODES:
+                self.assertNotIn(
+                    Recipe._meta.db_table,
+                    [child.get('Relation Name') for child in iter_nodes(node)],
+                    node,
+                )
+        ids = list(queryset.values_list('pk', flat=True))
+        self.assertEqual(len(ids), len(set(ids)))
+        self.assertEqual(set(ids), set(expected_ids))
+
+    def get_owner(self, model):
+        return User.objects.get(
+            pk=model.objects.values_list('customer', flat=True).first(),
+        )
+
+    def test_is_favorited(self):
+        user = self.get_owner(Favorite)
+        self.assert_plan(
+            self.filter(user, {'is_favorited': 1}),
+            Favorite.objects.filter(customer=user).values_list(
+                'recipe',
+                flat=True,
+            ),
+        )
+
+    def test_is_in_shopping_cart(self):
+        user = self.get_owner(ShoppingCart)
+        self.assert_plan(
+            self.filter(user, {'is_in_shopping_cart': 1}),
+            ShoppingCart.objects.filter(customer=user).values_list(
+                'recipe',
+                flat=True,
+            ),
+        )
+
+    def test_tags(self):
+        tags = list(Tag.objects.order_by('pk')[:3])
+        self.assert_plan(
+            self.filter(self.users[0], {'tags': [tag.slug for tag in tags]}),
+            TagInRecipe.objects.filter(tag__in=tags).values_list(
+                'recipe',
+                flat=True,
+            ),
+        )
+
+    def test_checks_detect_join_fan_out(self):
+        tags = list(Tag.objects.order_by('pk')[:3])
+        with self.assertRaises(AssertionError):
+            self.assert_plan(
+                Recipe.objects.filter(tags__in=tags).distinct(),
+                TagInRecipe.objects.filter(tag__in=tags).values_list(
+                    'recipe',
+                    flat=True,
+                ),
+            )
+
+
+class TagIdsCacheTest(DatasetTestCase):
+    dataset = {'users': 2, 'recipes': 1}
+
+    def test_sees_tags_added_elsewhere(self):
+        slug = 'added_elsewhere'
+        self.assertEqual(get_tag_ids([slug]), [])
+        tag, = Tag.objects.bulk_create([Tag(name='Новый тег', slug=slug)])
+        self.assertEqual(get_tag_ids([slug]), [])
+        bump_version('tags')
+        self.assertEqual(get_tag_ids([slug]), [tag.pk])
+
+    @override_settings(TAG_IDS_CACHE_TIMEOUT=0)
+    def test_expires(self):
+        slug = 'added_elsewhere'
+        get_tag_ids([slug])
+        tag, = Tag.objects.bulk_create([Tag(name='Новый тег', slug=slug)])
+        self.assertEqual(get_tag_ids([slug]), [tag.pk])
@@ -0,0 +1,36 @@
+from unittest import mock
+
+from django.conf import settings
+from django.core.files.storage import default_storage
+from django.urls import reverse
+
+from recipes.models import Recipe
+from ..images import generate_renditions
+from .utils import DatasetTestCase
+
+
+class RenditionUrlsTest(DatasetTestCase):
+    dataset = {'users': 4, 'recipes': 3}
+
+    def test_serializers_do_not_probe_storage(self):
+        with mock.patch.object(
+            default_storage,
+            'exists',
+            side_effect=AssertionError,
+        ):
+            for name in ('recipe-list', 'customuser-list'):
+                response = self.get_client().get(reverse(name))
+                self.assertEqual(response.status_code, 200)
+
+    def test_urls_point_at_generated_files(self):
+        recipe = Recipe.objects.order_by('pk').first()
+        response = self.get_client().get(
+            reverse('recipe-detail', args=[recipe.pk]),
+        )
+        urls = response.data['image_renditions']
+        self.assertEqual(set(urls), set(settings.IMAGE_RENDITIONS))
+        generate_renditions(recipe.image.name)
+        for url in urls.values():
+            name = url.split(settings.MEDIA_URL, 1)[1]
+            self.assertNotEqual(name, recipe.image.name)
+            self.assertTrue(default_storage.exists(name))
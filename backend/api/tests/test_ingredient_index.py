@@ -0,0 +1,79 @@
+from unittest import mock
+
+from django.db import connection
+from django.test import override_settings
+from django.urls import reverse
+
+from recipes.catalog import bump_catalog_version
+from recipes.models import Ingredient
+from .. import ingredient_index
+from ..ingredient_index import IngredientIndex
+from .utils import DatasetTestCase
+
+
+@override_settings(
+    INGREDIENT_SEARCH_LIMIT=3,
+    INGREDIENT_INDEX_CHECK_INTERVAL=0,
+)
+class IngredientIndexTest(DatasetTestCase):
+    dataset = {'users': 2, 'recipes': 1}
+
+    def test_empty_name_is_limited(self):
+        response = self.get_client().get(reverse('ingredient-list'))
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(response.data), 3)
+
+    def test_rebuilds_after_change_in_other_process(self):
+        index = IngredientIndex()
+        self.assertEqual(index.search('новый'), [])
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f'INSERT INTO {Ingredient._meta.db_table} '
+                '(name, measurement_unit) VALUES (%s, %s)',
+                ['новый ингредиент', 'г'],
+            )
+        self.assertEqual(index.search('новый'), [])
+        bump_catalog_version('ingredients')
+        self.assertEqual(
+            [item['name'] for item in index.search('новый')],
+            ['новый ингредиент'],
+        )
+
+    def test_search_reads_one_snapshot_during_rebuild(self):
+        index = IngredientIndex()
+        expected = index.search('ин')
+        get_item = ingredient_index.get_item
+
+        def rebuild_and_get_item(snapshot, position):
+            if not Ingredient.objects.filter(name__startswith='ааа').exists():
+                Ingredient.objects.bulk_create(
+                    [Ingredient(name='ааа ингредиент', measurement_unit='г')],
+                )
+                bump_catalog_version('ingredients')
+                index.get_snapshot()
+            return get_item(snapshot, position)
+
+        with mock.patch.object(
+            ingredient_index,
+            'get_item',
+            rebuild_and_get_item,
+        ):
+            self.assertEqual(index.search('ин'), expected)
+        self.assertEqual(len(index.search('ин')), len(expected) + 1)
+
+    def test_response_cache_follows_shared_version(self):
+        client = self.get_client()
+        path = reverse('ingredient-list')
+        first = client.get(path, {'name': 'новый'})
+        self.assertEqual(first.data, [])
+        Ingredient.objects.bulk_create(
+            [Ingredient(name='новый ингредиент', measurement_unit='г')],
+        )
+        bump_catalog_version('ingredients')
+        second = client.get(
+            path,
+            {'name': 'новый'},
+            HTTP_IF_NONE_MATCH=first['ETag'],
+        )
+        self.assertEqual(second.status_code, 200)
+        self.assertEqual(len(second.data), 1)
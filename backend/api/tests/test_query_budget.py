@@ -0,0 +1,19 @@
+from django.test import TestCase
+
+from .query_budget import (
+    check_budget,
+    get_missing_scenarios,
+    get_routes,
+    load_budget,
+    measure_routes,
+)
+
+
+class QueryBudgetTest(TestCase):
+    def test_every_route_has_scenario(self):
+        self.assertEqual(get_missing_scenarios(get_routes()), [])
+
+    def test_routes_fit_budget(self):
+        routes = get_routes()
+        _, errors = check_budget(routes, measure_routes(routes), load_budget())
+        self.assertEqual(errors, [])
@@ -0,0 +1,82 @@
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from recipes.models import Recipe
+from .utils import DatasetTestCase
+
+SMALL_PAGE = 2
+LARGE_PAGE = 20
+
+
+class RecipeListQueriesTest(DatasetTestCase):
+    dataset = {'users': 8, 'recipes': 6, 'favorites': 4, 'shopping_carts': 4}
+
+    def get_page(self, client, limit):
+        response = client.get(reverse('recipe-list'), {'limit': limit})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(response.data['results']), limit)
+
+    def assert_constant_queries(self, client):
+        self.assertGreater(Recipe.objects.count(), LARGE_PAGE)
+        with CaptureQueriesContext(connection) as queries:
+            self.get_page(client, SMALL_PAGE)
+        self.setUp()
+        with self.assertNumQueries(len(queries)):
+            self.get_page(client, LARGE_PAGE)
+
+    def test_anonymous(self):
+        self.assert_constant_queries(self.get_client())
+
+    def test_authenticated(self):
+        self.assert_constant_queries(self.get_client(self.users[0]))
+
+
+class CursorPaginationTest(DatasetTestCase):
+    dataset = {'users': 6, 'recipes': 3, 'favorites': 4}
+
+    def walk(self, params):
+        client = self.get_client()
+        response = client.get(
+            reverse('recipe-list'),
+            {'pagination': 'cursor', 'limit': SMALL_PAGE, **params},
+        )
+        ids = []
+        while True:
+            self.assertEqual(response.status_code, 200)
+            ids += [recipe['id'] for recipe in response.data['results']]
+            if not response.data['next']:
+                return ids
+            response = client.get(response.data['next'])
+
+    def test_orderings(self):
+        recipes = Recipe.objects.values_list('pk', flat=True)
+        for params, ordering in (
+            ({}, ('-id',)),
+            ({'ordering': '-favorites_count'}, ('-favorites_count', '-id')),
+            (
+                {'ordering': '-favorites_count,-id'},
+                ('-favorites_count', '-id'),
+            ),
+        ):
+            with self.subTest(params=params):
+                self.assertEqual(
+                    self.walk(params),
+                    list(recipes.order_by(*ordering)),
+                )
+
+    def test_rejected_orderings(self):
+        client = self.get_client()
+        for name, params in (
+            ('recipe-list', {'search': 'рецепт'}),
+            ('recipe-list', {'ordering': '-popularity'}),
+            ('recipe-list', {'ordering': 'favorites_count'}),
+            ('recipe-trending', {}),
+        ):
+            with self.subTest(name=name, params=params):
+                response = client.get(
+                    reverse(name),
+                    {'pagination': 'cursor', **params},
+                )
+                self.assertEqual(response.status_code, 400)
+                self.assertIn('pagination', response.data)
@@ -0,0 +1,61 @@
+from unittest import mock
+
+from django.contrib.auth.models import AnonymousUser
+
+from recipes.models import Favorite, Recipe, ShoppingCart
+from ..recipe_state import RecipeState, get_recipe_state
+from ..relations import favorites
+from .utils import DatasetTestCase
+
+
+class RecipeStateTest(DatasetTestCase):
+    dataset = {'users': 4, 'recipes': 4, 'favorites': 0, 'shopping_carts': 0}
+
+    @classmethod
+    def setUpTestData(cls):
+        super().setUpTestData()
+        cls.user = cls.users[0]
+        cls.recipes = list(Recipe.objects.order_by('pk'))
+        Favorite.objects.create(customer=cls.user, recipe=cls.recipes[0])
+        ShoppingCart.objects.create(customer=cls.user, recipe=cls.recipes[1])
+
+    def get_flags(self):
+        state = get_recipe_state(self.user)
+        return [
+            (state.is_favorited(pk), state.is_in_shopping_cart(pk))
+            for pk in [recipe.pk for recipe in self.recipes[:3]]
+        ]
+
+    def test_state(self):
+        self.assertEqual(
+            self.get_flags(),
+            [(True, False), (False, True), (False, False)],
+        )
+        with self.assertNumQueries(0):
+            get_recipe_state(self.user)
+        self.assertFalse(
+            get_recipe_state(AnonymousUser()).is_favorited(self.recipes[0].pk),
+        )
+
+    def test_invalidated_on_change(self):
+        self.get_flags()
+        ShoppingCart.objects.filter(customer=self.user).delete()
+        favorites.add_one(self.user, self.recipes[2].pk)
+        self.assertEqual(
+            self.get_flags(),
+            [(True, False), (False, False), (True, False)],
+        )
+
+    def test_change_while_reading(self):
+        init = RecipeState.__init__
+
+        def build(state, *args):
+            init(state, *args)
+            Favorite.objects.create(customer=self.user, recipe=self.recipes[2])
+
+        with mock.patch.object(RecipeState, '__init__', build):
+            get_recipe_state(self.user)
+        self.assertEqual(
+            self.get_flags(),
+            [(True, False), (False, True), (True, False)],
+        )
@@ -0,0 +1,218 @@
+from django.conf import settings
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from rest_framework.exceptions import ValidationError
+
+from recipes.models import (
+    AmountOfIngredientInRecipe,
+    Ingredient,
+    Recipe,
+    Tag,
+    TagInRecipe,
+)
+from ..serializers import RecipeCreateUpdateSerializer
+from .utils import DatasetTestCase
+
+WRITES = ('INSERT', 'UPDATE', 'DELETE')
+
+
+class RecipeRelationsUpdateTest(DatasetTestCase):
+    dataset = {'users': 2, 'recipes': 0}
+
+    @classmethod
+    def setUpTestData(cls):
+        super().setUpTestData()
+        cls.tags = list(Tag.objects.order_by('pk')[:3])
+        cls.ingredients = list(Ingredient.objects.order_by('pk')[:3])
+        cls.recipe = Recipe.objects.create(
+            author=cls.users[0],
+            name='Рецепт',
+            text='Текст',
+            cooking_time=10,
+        )
+        TagInRecipe.objects.bulk_create(
+            TagInRecipe(recipe=cls.recipe, tag=tag) for tag in cls.tags[:2]
+        )
+        AmountOfIngredientInRecipe.objects.bulk_create(
+            AmountOfIngredientInRecipe(
+                recipe=cls.recipe,
+                ingredient=ingredient,
+                amount=100,
+            )
+            for ingredient in cls.ingredients[:2]
+        )
+
+    def get_writes(self, method, items):
+        with CaptureQueriesContext(connection) as queries:
+            result = getattr(RecipeCreateUpdateSerializer(), method)(
+                self.recipe,
+                items,
+            )
+        writes = [
+            query['sql'].split()[0]
+            for query in queries.captured_queries
+            if query['sql'].startswith(WRITES)
+        ]
+        return result, writes
+
+    def get_tags(self):
+        return set(
+            TagInRecipe.objects.filter(recipe=self.recipe).values_list(
+                'tag_id',
+                flat=True,
+            ),
+        )
+
+    def get_rows(self):
+        return {
+            row.ingredient_id: (row.pk, row.amount)
+            for row in AmountOfIngredientInRecipe.objects.filter(
+                recipe=self.recipe,
+            )
+        }
+
+    def test_unchanged_tags(self):
+        _, writes = self.get_writes(
+            'update_tags',
+            [{'id': tag} for tag in self.tags[:2]],
+        )
+        self.assertEqual(writes, [])
+        self.assertEqual(self.get_tags(), {tag.pk for tag in self.tags[:2]})
+
+    def test_replaced_tags(self):
+        _, writes = self.get_writes(
+            'update_tags',
+            [{'id': tag} for tag in self.tags[1:]],
+        )
+        self.assertEqual(writes, ['DELETE', 'INSERT'])
+        self.assertEqual(self.get_tags(), {tag.pk for tag in self.tags[1:]})
+
+    def test_unchanged_ingredients(self):
+        rows = self.get_rows()
+        result, writes = self.get_writes(
+            'update_ingredients',
+            [
+                {'id': ingredient, 'amount': 100}
+                for ingredient in self.ingredients[:2]
+            ],
+        )
+        self.assertEqual(writes, [])
+        self.assertEqual(result, (False, False))
+        self.assertEqual(self.get_rows(), rows)
+
+    def test_amount_change_is_update(self):
+        rows = self.get_rows()
+        first, second = self.ingredients[:2]
+        result, writes = self.get_writes(
+            'update_ingredients',
+            [{'id': first, 'amount': 250}, {'id': second, 'amount': 100}],
+        )
+        self.assertEqual(writes, ['UPDATE'])
+        self.assertEqual(result, (False, True))
+        self.assertEqual(
+            self.get_rows(),
+            {
+                first.pk: (rows[first.pk][0], 250),
+                second.pk: rows[second.pk],
+            },
+        )
+
+    def test_removed_ingredient(self):
+        rows = self.get_rows()
+        second = self.ingredients[1]
+        result, writes = self.get_writes(
+            'update_ingredients',
+            [{'id': second, 'amount': 100}],
+        )
+        self.assertEqual(writes, ['DELETE'])
+        self.assertEqual(result, (True, True))
+        self.assertEqual(self.get_rows(), {second.pk: rows[second.pk]})
+
+    def test_added_ingredient(self):
+        rows = self.get_rows()
+        first, second, third = self.ingredients
+        result, writes = self.get_writes(
+            'update_ingredients',
+            [
+                {'id': first, 'amount': 100},
+                {'id': second, 'amount': 100},
+                {'id': third, 'amount': 30},
+            ],
+        )
+        self.assertEqual(writes, ['INSERT'])
+        self.assertEqual(result, (True, True))
+        self.assertEqual(self.get_rows()[third.pk][1], 30)
+        self.assertEqual(
+            {pk: row for pk, row in self.get_rows().items() if pk in rows},
+            rows,
+        )
+
+
+class ResolveIdsTest(DatasetTestCase):
+    dataset = {'users': 1, 'recipes': 0}
+
+    @classmethod
+    def setUpTestData(cls):
+        super().setUpTestData()
+        cls.tag_ids = list(
+            Tag.objects.order_by('pk').values_list('pk', flat=True)[:3],
+        )
+        cls.ingredient_ids = list(
+            Ingredient.objects.order_by('pk').values_list('pk', flat=True)[:3],
+        )
+        cls.missing = Ingredient.objects.order_by('-pk')[0].pk + 1
+
+    def validate_ingredients(self, ids):
+        return RecipeCreateUpdateSerializer().validate_ingredients(
+            [{'id': pk, 'amount': 10} for pk in ids],
+        )
+
+    def validate_tags(self, ids):
+        return RecipeCreateUpdateSerializer().validate_tags(
+            [{'id': pk} for pk in ids],
+        )
+
+    def assert_error(self, validate, ids, message):
+        with self.assertRaises(ValidationError) as context:
+            validate(ids)
+        self.assertEqual(context.exception.detail, [message])
+
+    def test_resolved_in_one_query(self):
+        with self.assertNumQueries(1):
+            ingredients = self.validate_ingredients(self.ingredient_ids)
+        self.assertEqual(
+            [(item['id'].pk, item['amount']) for item in ingredients],
+            [(pk, 10) for pk in self.ingredient_ids],
+        )
+        with self.assertNumQueries(1):
+            tags = self.validate_tags(self.tag_ids)
+        self.assertEqual([item['id'].pk for item in tags], self.tag_ids)
+
+    def test_missing(self):
+        missing = [self.missing + 1, self.missing]
+        with self.assertNumQueries(1):
+            self.assert_error(
+                self.validate_ingredients,
+                [self.ingredient_ids[0], *missing],
+                settings.ERROR_MESSAGES['missing_ingredients'].format(
+                    ids=', '.join(map(str, missing)),
+                ),
+            )
+        self.assert_error(
+            self.validate_tags,
+            [self.tag_ids[0], 0],
+            settings.ERROR_MESSAGES['missing_tags'].format(ids='0'),
+        )
+
+    def test_repeated(self):
+        with self.assertNumQueries(0):
+            self.assert_error(
+                self.validate_ingredients,
+                [self.ingredient_ids[0], self.ingredient_ids[0]],
+                settings.ERROR_MESSAGES['repeat_ingredients'],
+            )
+        self.assert_error(
+            self.validate_tags,
+            [self.tag_ids[1], self.tag_ids[1]],
+            settings.ERROR_MESSAGES['repeat_tags'],
+        )
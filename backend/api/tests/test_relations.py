@@ -0,0 +1,187 @@
+import random
+import threading
+import time
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.db import connection, transaction
+from django.test import TransactionTestCase
+from django.urls import reverse
+from rest_framework.authtoken.models import Token
+from rest_framework.test import APIClient
+
+from recipes.dataset import get_image
+from recipes.models import Favorite, Recipe, ShoppingCart, Subscription
+from ..relations import favorites
+from .utils import TemporaryMediaMixin
+
+User = get_user_model()
+
+THREADS = 8
+ROUNDS = 5
+LOCK_TIMEOUT = 10
+
+
+def run_concurrently(*requests):
+    barrier = threading.Barrier(len(requests))
+    statuses = [None] * len(requests)
+
+    def run(index, request):
+        try:
+            barrier.wait()
+            statuses[index] = request().status_code
+        finally:
+            connection.close()
+
+    threads = [
+        threading.Thread(target=run, args=(index, request))
+        for index, request in enumerate(requests)
+    ]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return statuses
+
+
+def wait_for_lock():
+    deadline = time.monotonic() + LOCK_TIMEOUT
+    with connection.cursor() as cursor:
+        while time.monotonic() < deadline:
+            cursor.execute(
+                'SELECT EXISTS(SELECT 1 FROM pg_locks WHERE NOT granted)',
+            )
+            if cursor.fetchone()[0]:
+                return True
+            time.sleep(0.01)
+    return False
+
+
+class ConcurrentRelationsTest(TemporaryMediaMixin, TransactionTestCase):
+    def setUp(self):
+        cache.clear()
+        self.users = [
+            User.objects.create_user(
+                username=f'user{number}',
+                email=f'user{number}@example.com',
+                first_name='Имя',
+                last_name='Фамилия',
+            )
+            for number in range(THREADS)
+        ]
+        self.tokens = [
+            Token.objects.create(user=user).key for user in self.users
+        ]
+        self.recipes = [
+            Recipe.objects.create(
+                author=self.users[-1],
+                name=f'Рецепт {number}',
+                text='Текст',
+                cooking_time=10,
+                image=get_image(),
+            )
+            for number in range(4)
+        ]
+
+    def get_client(self, index=0):
+        client = APIClient()
+        client.credentials(HTTP_AUTHORIZATION=f'Token {self.tokens[index]}')
+        return client
+
+    def assert_counters(self):
+        for recipe in Recipe.objects.all():
+            self.assertEqual(
+                recipe.favorites_count,
+                Favorite.objects.filter(recipe=recipe).count(),
+            )
+            self.assertEqual(
+                recipe.shopping_carts_count,
+                ShoppingCart.objects.filter(recipe=recipe).count(),
+            )
+        for user in User.objects.all():
+            self.assertEqual(
+                user.subscribers_count,
+                Subscription.objects.filter(author=user).count(),
+            )
+
+    def test_same_favorite_added_and_removed_in_parallel(self):
+        path = reverse('recipe-favorite', args=[self.recipes[0].pk])
+        statuses = run_concurrently(
+            *(lambda: self.get_client().post(path) for _ in range(THREADS)),
+        )
+        self.assertEqual(sorted(statuses), [201] + [400] * (THREADS - 1))
+        self.assertEqual(Favorite.objects.count(), 1)
+        self.assert_counters()
+        statuses = run_concurrently(
+            *(lambda: self.get_client().delete(path) for _ in range(THREADS)),
+        )
+        self.assertEqual(sorted(statuses), [204] + [400] * (THREADS - 1))
+        self.assertFalse(Favorite.objects.exists())
+        self.assert_counters()
+
+    def test_many_owners_do_not_lose_updates(self):
+        path = reverse('recipe-shopping_cart', args=[self.recipes[0].pk])
+        statuses = run_concurrently(
+            *(
+                lambda index=index: self.get_client(index).post(path)
+                for index in range(THREADS)
+            ),
+        )
+        self.assertEqual(statuses, [201] * THREADS)
+        recipe = Recipe.objects.get(pk=self.recipes[0].pk)
+        self.assertEqual(recipe.shopping_carts_count, THREADS)
+        self.assert_counters()
+
+    def test_counter_update_waiting_on_lock_is_not_lost(self):
+        recipe = self.recipes[0]
+        path = reverse('recipe-favorite', args=[recipe.pk])
+        statuses = []
+        waiter = threading.Thread(
+            target=lambda: statuses.extend(
+                run_concurrently(lambda: self.get_client(1).post(path)),
+            ),
+        )
+        with transaction.atomic():
+            favorites.add_one(self.users[0], recipe.pk)
+            waiter.start()
+            self.assertTrue(wait_for_lock())
+        waiter.join()
+        self.assertEqual(statuses, [201])
+        recipe.refresh_from_db()
+        self.assertEqual(recipe.favorites_count, 2)
+        self.assert_counters()
+
+    def test_bulk_add_and_remove_in_parallel(self):
+        rng = random.Random(0)
+        ids = [recipe.pk for recipe in self.recipes]
+        authors = [user.pk for user in self.users[1:]]
+        requests = []
+        for index in range(THREADS):
+            client = self.get_client(index % 2)
+            method = client.post if index % 2 == 0 else client.delete
+            for name, targets in (
+                ('recipe-favorite-bulk', ids),
+                ('recipe-shopping_cart-bulk', ids),
+                ('customuser-subscribe-bulk', authors),
+            ):
+                requests.append(
+                    lambda method=method, name=name, targets=rng.sample(
+                        targets,
+                        len(targets) // 2 + 1,
+                    ): method(
+                        reverse(name),
+                        {'ids': targets},
+                        format='json',
+                    ),
+                )
+        for _ in range(ROUNDS):
+            statuses = run_concurrently(*requests)
+            self.assertEqual(set(statuses), {200})
+            self.assert_counters()
+        for model, owner, target in (
+            (Favorite, 'customer', 'recipe'),
+            (ShoppingCart, 'customer', 'recipe'),
+            (Subscription, 'subscriber', 'author'),
+        ):
+            pairs = list(model.objects.values_list(owner, target))
+            self.assertEqual(len(pairs), len(set(pairs)))
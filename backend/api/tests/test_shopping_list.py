@@ -0,0 +1,67 @@
+import json
+
+from django.urls import reverse
+
+from recipes.models import Recipe, ShoppingCart
+from ..renderers import SHOPPING_LIST_RENDERERS
+from ..shopping_list import aggregate_shopping_list, iter_shopping_list
+from .utils import DatasetTestCase
+
+
+class ShoppingListCacheTest(DatasetTestCase):
+    dataset = {'users': 4, 'recipes': 4, 'shopping_carts': 0}
+
+    @classmethod
+    def setUpTestData(cls):
+        super().setUpTestData()
+        cls.user = cls.users[0]
+        cls.recipes = list(Recipe.objects.order_by('pk'))
+        ShoppingCart.objects.create(customer=cls.user, recipe=cls.recipes[0])
+
+    def get_expected(self):
+        return list(aggregate_shopping_list(self.user))
+
+    def test_cached(self):
+        expected = self.get_expected()
+        self.assertEqual(list(iter_shopping_list(self.user)), expected)
+        with self.assertNumQueries(0):
+            self.assertEqual(list(iter_shopping_list(self.user)), expected)
+
+    def test_cart_changed_while_streaming(self):
+        rows = iter_shopping_list(self.user)
+        next(rows)
+        ShoppingCart.objects.create(customer=self.user, recipe=self.recipes[1])
+        list(rows)
+        self.assertEqual(
+            list(iter_shopping_list(self.user)),
+            self.get_expected(),
+        )
+
+
+class ShoppingListDownloadTest(DatasetTestCase):
+    dataset = {'users': 4, 'recipes': 4, 'shopping_carts': 2}
+
+    def download(self, client, **params):
+        return client.get(reverse('recipe-download_shopping_cart'), params)
+
+    def test_formats(self):
+        client = self.get_client(self.users[0])
+        for renderer in SHOPPING_LIST_RENDERERS:
+            response = self.download(client, format=renderer.format)
+            self.assertEqual(response.status_code, 200)
+            self.assertTrue(
+                response['Content-Type'].startswith(renderer.media_type),
+            )
+            content = b''.join(response.streaming_content).decode()
+            if renderer.format == 'json':
+                json.loads(content)
+
+    def test_errors_are_json(self):
+        for client, params, status in (
+            (self.get_client(self.users[0]), {'format': 'xml'}, 404),
+            (self.get_client(), {'format': 'csv'}, 401),
+        ):
+            response = self.download(client, **params)
+            self.assertEqual(response.status_code, status)
+            self.assertEqual(response['Content-Type'], 'application/json')
+            self.assertIn('detail', response.json())
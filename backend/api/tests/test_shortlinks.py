@@ -0,0 +1,96 @@
+import re
+import shutil
+import tempfile
+from pathlib import Path
+from unittest import skipUnless
+
+from django.conf import settings
+from django.test import SimpleTestCase, override_settings
+
+from recipes.models import Recipe
+from .. import shortlinks
+from .utils import DatasetTestCase
+
+NGINX_CONF = settings.BASE_DIR.parent / 'nginx' / 'nginx.conf'
+LARGE_MAP = 100000
+POINTER_SIZE = 8
+
+
+def get_nginx_setting(name):
+    return int(
+        re.search(rf'^{name}\s+(\d+);', NGINX_CONF.read_text(), re.M)[1],
+    )
+
+
+def get_element_size(key):
+    return POINTER_SIZE + -(-(len(key) + 2) // POINTER_SIZE) * POINTER_SIZE
+
+
+@skipUnless(NGINX_CONF.is_file(), 'nginx.conf недоступен')
+class NginxMapSizeTest(SimpleTestCase):
+    def assert_map_fits(self):
+        keys = [
+            line.split('"')[1]
+            for line in shortlinks.get_map_lines(range(1, LARGE_MAP + 1))
+        ]
+        self.assertLessEqual(
+            len(keys),
+            get_nginx_setting('map_hash_max_size'),
+        )
+        self.assertLessEqual(
+            max(map(get_element_size, keys)) + POINTER_SIZE,
+            get_nginx_setting('map_hash_bucket_size'),
+        )
+
+    def test_large_map(self):
+        self.assert_map_fits()
+
+    @override_settings(SHORTLINK_CHECKSUM=True)
+    def test_large_map_with_checksum(self):
+        self.assert_map_fits()
+
+
+class ShortLinkMapTest(DatasetTestCase):
+    dataset = {'users': 3, 'recipes': 3}
+
+    def setUp(self):
+        super().setUp()
+        directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, directory, ignore_errors=True)
+        self.path = Path(directory) / 'shortlinks.map'
+        self.tombstones = shortlinks.get_tombstones_path(self.path)
+        map_settings = override_settings(
+            SHORTLINK_MAP_FILE=str(self.path),
+            SHORTLINK_MAP_COMPACT_AFTER=4,
+        )
+        map_settings.enable()
+        self.addCleanup(map_settings.disable)
+        self.ids = list(
+            Recipe.objects.order_by('pk').values_list('pk', flat=True),
+        )
+        shortlinks.export_map()
+
+    def test_remove_appends_tombstones(self):
+        content = self.path.read_text()
+        shortlinks.remove_from_map(self.ids[0])
+        self.assertEqual(self.path.read_text(), content)
+        self.assertEqual(
+            self.tombstones.read_text(),
+            ''.join(
+                shortlinks.TOMBSTONE_LINE.format(code)
+                for code, _ in shortlinks.get_codes([self.ids[0]])
+            ),
+        )
+
+    @override_settings(SHORTLINK_CHECKSUM=True)
+    def test_compacted_after_limit(self):
+        shortlinks.export_map()
+        removed = self.ids[:2]
+        Recipe.objects.filter(pk__in=removed).delete()
+        for pk in removed:
+            shortlinks.remove_from_map(pk)
+        self.assertFalse(self.tombstones.exists())
+        self.assertEqual(
+            self.path.read_text(),
+            ''.join(shortlinks.get_map_lines(self.ids[2:])),
+        )
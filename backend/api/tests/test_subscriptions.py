@@ -0,0 +1,73 @@
+from django.urls import reverse
+
+from recipes.models import Recipe, Subscription
+from .utils import DatasetTestCase
+
+
+class RecipesLimitTest(DatasetTestCase):
+    dataset = {'users': 8, 'recipes': 4, 'subscriptions': 4}
+
+    @classmethod
+    def setUpTestData(cls):
+        super().setUpTestData()
+        cls.user, *cls.authors = cls.users
+        Subscription.objects.filter(subscriber=cls.user).delete()
+        Subscription.objects.bulk_create(
+            Subscription(subscriber=cls.user, author=author)
+            for author in cls.authors[:3]
+            if Recipe.objects.filter(author=author).exists()
+        )
+
+    def get_feed(self, recipes_limit):
+        return self.get_client(self.user).get(
+            reverse('customuser-subscriptions'),
+            {'recipes_limit': recipes_limit},
+        )
+
+    def test_limit(self):
+        for recipes_limit in (0, 1, 2):
+            with self.subTest(recipes_limit=recipes_limit):
+                response = self.get_feed(recipes_limit)
+                self.assertEqual(response.status_code, 200)
+                self.assertTrue(response.data['results'])
+                for author in response.data['results']:
+                    self.assertEqual(
+                        len(author['recipes']),
+                        min(recipes_limit, author['recipes_count']),
+                    )
+
+    def test_invalid_limit(self):
+        for recipes_limit in ('abc', '-1', '1.5'):
+            with self.subTest(recipes_limit=recipes_limit):
+                self.assertEqual(self.get_feed(recipes_limit).status_code, 400)
+
+    def test_subscribe_invalid_limit(self):
+        author = self.authors[-1]
+        Subscription.objects.filter(
+            subscriber=self.user,
+            author=author,
+        ).delete()
+        response = self.get_client(self.user).post(
+            reverse('customuser-subscribe', args=[author.pk])
+            + '?recipes_limit=x',
+        )
+        self.assertEqual(response.status_code, 400)
+        self.assertFalse(
+            Subscription.objects.filter(
+                subscriber=self.user,
+                author=author,
+            ).exists(),
+        )
+
+    def test_subscribe_zero_limit(self):
+        author = self.authors[-1]
+        Subscription.objects.filter(
+            subscriber=self.user,
+            author=author,
+        ).delete()
+        response = self.get_client(self.user).post(
+            reverse('customuser-subscribe', args=[author.pk])
+            + '?recipes_limit=0',
+        )
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(response.data['recipes'], [])
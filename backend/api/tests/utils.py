@@ -0,0 +1,52 @@
+import shutil
+import tempfile
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+from rest_framework.authtoken.models import Token
+from rest_framework.test import APIClient
+
+from recipes.dataset import generate
+from ..ingredient_index import ingredient_index
+
+User = get_user_model()
+
+PREFIX = 'test_'
+
+
+class TemporaryMediaMixin:
+    @classmethod
+    def setUpClass(cls):
+        cls.media_root = tempfile.mkdtemp()
+        cls.media_settings = override_settings(MEDIA_ROOT=cls.media_root)
+        cls.media_settings.enable()
+        super().setUpClass()
+
+    @classmethod
+    def tearDownClass(cls):
+        super().tearDownClass()
+        cls.media_settings.disable()
+        shutil.rmtree(cls.media_root, ignore_errors=True)
+
+
+class DatasetTestCase(TemporaryMediaMixin, TestCase):
+    dataset = {'users': 8}
+
+    @classmethod
+    def setUpTestData(cls):
+        generate(prefix=PREFIX, **cls.dataset)
+        cls.users = list(
+            User.objects.filter(username__startswith=PREFIX).order_by('pk'),
+        )
+
+    def setUp(self):
+        cache.clear()
+        ingredient_index.reset()
+
+    def get_client(self, user=None):
+        client = APIClient()
+        if user is not None:
+            token, _ = Token.objects.get_or_create(user=user)
+            client.credentials(HTTP_AUTHORIZATION=f'Token {token.key}')
+        return client
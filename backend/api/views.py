@@ -1,43 +1,66 @@
-import csv
-
+from django.conf import settings
 from django.contrib.auth import get_user_model
-from django.db.models import F, Sum
-from django.http import HttpResponse
+from django.db.models import Exists, OuterRef
+from django.http import Http404, StreamingHttpResponse
 from django.shortcuts import get_object_or_404, redirect
-from django.urls import reverse
-from django.utils import baseconv
 from django_filters.rest_framework import DjangoFilterBackend
 from djoser.views import UserViewSet
 from rest_framework import filters, permissions, status, viewsets
 from rest_framework.decorators import action
+from rest_framework.exceptions import ValidationError
+from rest_framework.renderers import JSONRenderer
 from rest_framework.response import Response
+from rest_framework.settings import api_settings
 from rest_framework.views import APIView
 
-from recipes.models import (
-    AmountOfIngredientInRecipe,
-    Favorite,
-    Ingredient,
-    Recipe,
-    ShoppingCart,
-    Subscription,
-    Tag,
+from recipes.models import Ingredient, Recipe, Subscription, Tag
+from . import relations, shortlinks
+from .cache import VersionedCacheMixin
+from .filter import (
+    IngredientNameFilter,
+    RecipeFilterBackend,
+    RecipeSearchFilterBackend,
 )
-from .filter import IngredientNameFilter, RecipeFilterBackend
+from .ingredient_index import ingredient_index
+from .pagination import CursorOrPageNumberPagination
 from .permissions import IsAuthorOrReadOnlyPermission
+from .renderers import SHOPPING_LIST_RENDERERS
 from .serializers import (
+    BulkIdsSerializer,
     FavoriteSerializer,
     IngredientSerializer,
     RecipeCreateUpdateSerializer,
     RecipeRetrieveSerializer,
+    RecipesLimitSerializer,
     ShoppingCartSerializer,
     SubscriptionCreateSerializer,
     SubscriptionListSerializer,
     TagSerializer,
     UserAvatarSerializer,
 )
+from .shopping_list import iter_shopping_list
 
 User = get_user_model()
 
+RECIPE_MINI_FIELDS = ('id', 'name', 'image', 'cooking_time')
+
+
+def get_bulk_response(request, relation):
+    serializer = BulkIdsSerializer(data=request.data)
+    serializer.is_valid(raise_exception=True)
+    ids = serializer.validated_data['ids']
+    if request.method == 'DELETE':
+        results = relation.remove(request.user, ids)
+    else:
+        results = relation.add(request.user, ids)
+    return Response(results, status=status.HTTP_200_OK)
+
+
+def get_recipes_limit(request):
+    serializer = RecipesLimitSerializer(data=request.query_params)
+    serializer.is_valid(raise_exception=True)
+    return serializer.validated_data.get('recipes_limit')
+
 
 class UserMeAvatarAPIView(APIView):
     def put(self, request):
@@ -55,8 +78,9 @@ class UserMeAvatarAPIView(APIView):
         return Response(status=status.HTTP_400_BAD_REQUEST)
 
 
-class IngredientViewSet(viewsets.ModelViewSet):
+class IngredientViewSet(VersionedCacheMixin, viewsets.ModelViewSet):
     http_method_names = ('get',)
+    cache_group = 'ingredients'
     serializer_class = IngredientSerializer
     queryset = Ingredient.objects.all()
     filter_backends = (DjangoFilterBackend, filters.SearchFilter)
@@ -64,26 +88,49 @@ class IngredientViewSet(viewsets.ModelViewSet):
     search_fields = ('^name',)
     pagination_class = None
 
+    def get_cache_versions(self, request):
+        return [
+            *super().get_cache_versions(request),
+            ingredient_index.get_version(),
+        ]
+
+    def list(self, request, *args, **kwargs):
+        return self.get_cached_response(self.search, request)
 
-class TagViewSet(viewsets.ModelViewSet):
+    def search(self, request):
+        return Response(
+            ingredient_index.search(
+                request.query_params.get('name'),
+                settings.INGREDIENT_SEARCH_LIMIT,
+            ),
+        )
+
+
+class TagViewSet(VersionedCacheMixin, viewsets.ModelViewSet):
     http_method_names = ('get',)
+    cache_group = 'tags'
     serializer_class = TagSerializer
     queryset = Tag.objects.all()
     pagination_class = None
 
 
-class RecipeViewSet(viewsets.ModelViewSet):
+class RecipeViewSet(VersionedCacheMixin, viewsets.ModelViewSet):
     http_method_names = ('get', 'post', 'patch', 'delete')
+    cache_group = 'recipes'
+    cached_actions = ('retrieve',)
+    cache_per_user = True
     queryset = Recipe.objects.all()
     filter_backends = (
         DjangoFilterBackend,
         RecipeFilterBackend,
         filters.OrderingFilter,
+        RecipeSearchFilterBackend,
     )
     filterset_fields = ('author',)
     permission_classes = (IsAuthorOrReadOnlyPermission,)
-    ordering_fields = ('id',)
+    ordering_fields = ('id', 'favorites_count', 'popularity')
     ordering = ('-id',)
+    pagination_class = CursorOrPageNumberPagination
 
     def get_serializer_class(self):
         if self.action == 'shopping_cart':
@@ -94,24 +141,46 @@ class RecipeViewSet(viewsets.ModelViewSet):
             return RecipeRetrieveSerializer
         return RecipeCreateUpdateSerializer
 
-    def get_response_for_create(self, request, pk):
-        customer = request.user
-        recipe = get_object_or_404(Recipe, pk=pk)
-        data = {'customer': customer.id, 'recipe': recipe.id}
-        serialazer = self.get_serializer(data=data)
-        serialazer.is_valid(raise_exception=True)
-        serialazer.save()
-        return Response(serialazer.data, status=status.HTTP_201_CREATED)
-
-    def get_response_for_delete(self, request, pk, model):
-        customer = request.user
-        recipe = get_object_or_404(Recipe, pk=pk)
-        obj = model.objects.filter(
-            customer=customer,
-            recipe=recipe,
+    def get_queryset(self):
+        if self.action in ('list', 'retrieve', 'trending'):
+            return Recipe.objects.for_retrieve(self.request.user)
+        return super().get_queryset()
+
+    def get_recipe_id(self, pk):
+        try:
+            return int(pk)
+        except (TypeError, ValueError):
+            raise Http404
+
+    def get_response_for_create(self, request, pk, relation, error):
+        recipe, created = relation.add_one(
+            request.user,
+            self.get_recipe_id(pk),
+            RECIPE_MINI_FIELDS,
+        )
+        if recipe is None:
+            raise Http404
+        if not created:
+            raise ValidationError(
+                {
+                    api_settings.NON_FIELD_ERRORS_KEY: [
+                        settings.ERROR_MESSAGES.get(error),
+                    ],
+                },
+            )
+        serializer = self.get_serializer(
+            relation.model(customer=request.user, recipe=recipe),
         )
-        if obj.exists():
-            obj.delete()
+        return Response(serializer.data, status=status.HTTP_201_CREATED)
+
+    def get_response_for_delete(self, request, pk, relation):
+        found, deleted = relation.remove_one(
+            request.user,
+            self.get_recipe_id(pk),
+        )
+        if not found:
+            raise Http404
+        if deleted:
             return Response(status=status.HTTP_204_NO_CONTENT)
         return Response(status=status.HTTP_400_BAD_REQUEST)
 
@@ -122,11 +191,30 @@ class RecipeViewSet(viewsets.ModelViewSet):
         url_name='shopping_cart',
     )
     def shopping_cart(self, request, pk=None):
-        return self.get_response_for_create(request, pk)
+        return self.get_response_for_create(
+            request,
+            pk,
+            relations.shopping_carts,
+            'shopping_cart_exists',
+        )
 
     @shopping_cart.mapping.delete
     def delete_shopping_cart(self, request, pk=None):
-        return self.get_response_for_delete(request, pk, ShoppingCart)
+        return self.get_response_for_delete(
+            request,
+            pk,
+            relations.shopping_carts,
+        )
+
+    @action(
+        methods=['post', 'delete'],
+        detail=False,
+        url_path='shopping_cart/bulk',
+        url_name='shopping_cart-bulk',
+        permission_classes=(permissions.IsAuthenticated,),
+    )
+    def bulk_shopping_cart(self, request):
+        return get_bulk_response(request, relations.shopping_carts)
 
     @action(
         methods=['post'],
@@ -135,11 +223,42 @@ class RecipeViewSet(viewsets.ModelViewSet):
         url_name='favorite',
     )
     def favorite(self, request, pk=None):
-        return self.get_response_for_create(request, pk)
+        return self.get_response_for_create(
+            request,
+            pk,
+            relations.favorites,
+            'favorite_exists',
+        )
 
     @favorite.mapping.delete
     def delete_favorite(self, request, pk=None):
-        return self.get_response_for_delete(request, pk, Favorite)
+        return self.get_response_for_delete(request, pk, relations.favorites)
+
+    @action(
+        methods=['post', 'delete'],
+        detail=False,
+        url_path='favorite/bulk',
+        url_name='favorite-bulk',
+        permission_classes=(permissions.IsAuthenticated,),
+    )
+    def bulk_favorite(self, request):
+        return get_bulk_response(request, relations.favorites)
+
+    @action(
+        methods=['get'],
+        detail=False,
+        url_path='trending',
+        url_name='trending',
+    )
+    def trending(self, request):
+        queryset = (
+            self.filter_queryset(self.get_queryset())
+            .filter(popularity__gt=0)
+            .order_by('-popularity', '-id')
+        )
+        page = self.paginate_queryset(queryset)
+        serializer = self.get_serializer(page, many=True)
+        return self.get_paginated_response(serializer.data)
 
     @action(
         methods=['get'],
@@ -149,10 +268,7 @@ class RecipeViewSet(viewsets.ModelViewSet):
     )
     def get_link(self, request, pk=None):
         recipe = self.get_object()
-        encoded_link = baseconv.base64.encode(recipe.id)
-        short_link = request.build_absolute_uri(
-            reverse('shortlink', kwargs={'encoded_id': encoded_link}),
-        )
+        short_link, = shortlinks.get_short_links(request, [recipe.id])
         return Response({'short-link': short_link}, status=status.HTTP_200_OK)
 
     @action(
@@ -160,57 +276,58 @@ class RecipeViewSet(viewsets.ModelViewSet):
         detail=False,
         url_path='download_shopping_cart',
         url_name='download_shopping_cart',
+        permission_classes=(permissions.IsAuthenticated,),
+        renderer_classes=SHOPPING_LIST_RENDERERS,
     )
     def download_shopping_cart(self, request):
-        customer = request.user
-        ingredients = (
-            AmountOfIngredientInRecipe.objects.filter(
-                recipe__shopping_carts__customer=customer,
-            )
-            .values(
-                name=F('ingredient__name'),
-                measurement_unit=F('ingredient__measurement_unit'),
-            )
-            .annotate(total_amount=Sum('amount'))
-            .order_by('name')
+        renderer = request.accepted_renderer
+        response = StreamingHttpResponse(
+            renderer.stream(iter_shopping_list(request.user)),
+            content_type=renderer.media_type,
         )
-
-        csv_response = HttpResponse(content_type='text/csv')
-        csv_response['Content-Disposition'] = (
-            'attachment; filename="shopping_cart.csv"'
+        response['Content-Disposition'] = (
+            f'attachment; filename="shopping_cart.{renderer.format}"'
         )
+        return response
 
-        writer = csv.writer(csv_response)
-        writer.writerow(['Название', 'Количество', 'Единицы измерения'])
-        for ingredient in ingredients:
-            writer.writerow(
-                [
-                    ingredient['name'],
-                    ingredient['total_amount'],
-                    ingredient['measurement_unit'],
-                ],
-            )
-
-        return csv_response
+    def finalize_response(self, request, response, *args, **kwargs):
+        if (
+            self.action == 'download_shopping_cart'
+            and isinstance(response, Response)
+        ):
+            request.accepted_renderer = JSONRenderer()
+            request.accepted_media_type = JSONRenderer.media_type
+        return super().finalize_response(request, response, *args, **kwargs)
 
 
 class ShortLinkView(APIView):
     def get(self, request, encoded_id):
-        if not set(encoded_id).issubset(set(baseconv.BASE64_ALPHABET)):
+        try:
+            path = shortlinks.resolve(encoded_id)
+        except ValueError:
             return Response(status=status.HTTP_400_BAD_REQUEST)
-        recipe_id = baseconv.base64.decode(encoded_id)
-        recipe = get_object_or_404(Recipe, pk=recipe_id)
-        recipe_url = request.build_absolute_uri(
-            reverse('recipe-detail', kwargs={'pk': recipe.id}).replace(
-                '/api', '',
-            ),
-        )
-        return redirect(recipe_url)
+        if path is None:
+            raise Http404
+        return redirect(request.build_absolute_uri(path))
 
 
 class UserViewSet(UserViewSet):
     permission_classes = [permissions.IsAuthenticatedOrReadOnly]
 
+    def get_queryset(self):
+        queryset = super().get_queryset()
+        user = self.request.user
+        if self.action in ('list', 'retrieve') and user.is_authenticated:
+            queryset = queryset.annotate(
+                is_subscribed=Exists(
+                    Subscription.objects.filter(
+                        subscriber=user,
+                        author=OuterRef('pk'),
+                    ),
+                ),
+            )
+        return queryset
+
     def get_permissions(self):
         if self.action == 'me':
             return [permissions.IsAuthenticated()]
@@ -227,7 +344,13 @@ class UserViewSet(UserViewSet):
         subsciber = request.user
         author = get_object_or_404(User, id=id)
         data = {'subscriber': subsciber.id, 'author': author.id}
-        serializer = self.get_serializer(data=data)
+        serializer = self.get_serializer(
+            data=data,
+            context={
+                **self.get_serializer_context(),
+                'recipes_limit': get_recipes_limit(request),
+            },
+        )
         serializer.is_valid(raise_exception=True)
         serializer.save()
         return Response(serializer.data, status=status.HTTP_201_CREATED)
@@ -245,16 +368,30 @@ class UserViewSet(UserViewSet):
             return Response(status=status.HTTP_204_NO_CONTENT)
         return Response(status=status.HTTP_400_BAD_REQUEST)
 
+    @action(
+        methods=['post', 'delete'],
+        detail=False,
+        url_path='subscribe/bulk',
+        url_name='subscribe-bulk',
+        permission_classes=(permissions.IsAuthenticated,),
+    )
+    def bulk_subscribe(self, request):
+        return get_bulk_response(request, relations.subscriptions)
+
     @action(
         methods=['get'],
         detail=False,
         url_path='subscriptions',
         url_name='subscriptions',
         serializer_class=SubscriptionListSerializer,
+        pagination_class=CursorOrPageNumberPagination,
     )
     def subscriptions(self, request):
+        recipes_limit = get_recipes_limit(request)
         pagintated_queryset = self.paginate_queryset(
-            Subscription.objects.filter(subscriber=request.user),
+            Subscription.objects.filter(subscriber=request.user)
+            .for_feed(recipes_limit)
+            .order_by('-id'),
         )
         serializer = self.get_serializer(pagintated_queryset, many=True)
         return self.get_paginated_response(serializer.data)
@@ -1,4 +1,5 @@
 import os
+from datetime import timedelta
 from pathlib import Path
 
 from dotenv import load_dotenv
@@ -26,6 +27,7 @@ INSTALLED_APPS = [
     'django.contrib.sessions',
     'django.contrib.messages',
     'django.contrib.staticfiles',
+    'django.contrib.postgres',
     'rest_framework',
     'rest_framework.authtoken',
     'django_filters',
@@ -36,6 +38,7 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    'api.middleware.RequestStatsMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
@@ -77,6 +80,25 @@ DATABASES = {
     },
 }
 
+CACHE_BACKENDS = {
+    'locmem': 'django.core.cache.backends.locmem.LocMemCache',
+    'file': 'django.core.cache.backends.filebased.FileBasedCache',
+    'redis': 'django_redis.cache.RedisCache',
+}
+
+CACHE_BACKEND = os.getenv('CACHE_BACKEND', 'locmem')
+
+CACHES = {
+    'default': {
+        'BACKEND': CACHE_BACKENDS.get(CACHE_BACKEND, CACHE_BACKEND),
+        'LOCATION': os.getenv('CACHE_LOCATION', ''),
+    },
+}
+
+API_CACHE_TIMEOUT = int(os.getenv('API_CACHE_TIMEOUT', 60 * 60))
+API_CACHE_MAX_AGE = int(os.getenv('API_CACHE_MAX_AGE', 60))
+TAG_IDS_CACHE_TIMEOUT = int(os.getenv('TAG_IDS_CACHE_TIMEOUT', 60))
+
 
 AUTH_PASSWORD_VALIDATORS = [
     {
@@ -122,12 +144,97 @@ REST_FRAMEWORK = {
         'rest_framework.permissions.IsAuthenticatedOrReadOnly',
     ),
     'DEFAULT_AUTHENTICATION_CLASSES': (
-        'rest_framework.authentication.TokenAuthentication',
+        'api.authentication.CachedTokenAuthentication',
     ),
     'DEFAULT_PAGINATION_CLASS': 'api.pagination.CustomPageNumberPagination',
     'PAGE_SIZE': 6,
 }
 
+SHOPPING_LIST_CACHE_TIMEOUT = int(
+    os.getenv('SHOPPING_LIST_CACHE_TIMEOUT', 60 * 60),
+)
+
+INGREDIENT_SEARCH_LIMIT = int(os.getenv('INGREDIENT_SEARCH_LIMIT', 50))
+INGREDIENT_INDEX_CHECK_INTERVAL = float(
+    os.getenv('INGREDIENT_INDEX_CHECK_INTERVAL', 5),
+)
+
+BULK_MAX_SIZE = int(os.getenv('BULK_MAX_SIZE', 100))
+
+REQUEST_STATS = bool(os.getenv('REQUEST_STATS'))
+REQUEST_STATS_LOG = os.getenv('REQUEST_STATS_LOG', '')
+REQUEST_STATS_REPEAT_THRESHOLD = int(
+    os.getenv('REQUEST_STATS_REPEAT_THRESHOLD', 10),
+)
+
+LOGGING = {
+    'version': 1,
+    'disable_existing_loggers': False,
+    'formatters': {
+        'message': {'format': '%(message)s'},
+    },
+    'handlers': {
+        'request_stats': (
+            {
+                'class': 'logging.FileHandler',
+                'filename': REQUEST_STATS_LOG,
+                'delay': True,
+                'formatter': 'message',
+            }
+            if REQUEST_STATS_LOG
+            else {'class': 'logging.StreamHandler', 'formatter': 'message'}
+        ),
+    },
+    'loggers': {
+        'api.request_stats': {
+            'handlers': ['request_stats'],
+            'level': 'INFO',
+            'propagate': False,
+        },
+    },
+}
+
+SHORTLINK_MAP_FILE = os.getenv('SHORTLINK_MAP_FILE', '')
+SHORTLINK_CACHE_SIZE = int(os.getenv('SHORTLINK_CACHE_SIZE', 10000))
+SHORTLINK_CHECKSUM = bool(os.getenv('SHORTLINK_CHECKSUM'))
+SHORTLINK_MAP_COMPACT_AFTER = int(
+    os.getenv('SHORTLINK_MAP_COMPACT_AFTER', 1000),
+)
+
+CATALOG_DIR = Path(os.getenv('CATALOG_DIR', BASE_DIR.parent / 'data'))
+CATALOG_BATCH_SIZE = int(os.getenv('CATALOG_BATCH_SIZE', 1000))
+
+RECIPE_SEARCH_CONFIG = 'russian'
+
+RECIPE_STATE_CACHE_TIMEOUT = int(
+    os.getenv('RECIPE_STATE_CACHE_TIMEOUT', 60 * 60),
+)
+
+POPULARITY_HALF_LIFE = timedelta(
+    hours=int(os.getenv('POPULARITY_HALF_LIFE_HOURS', 72)),
+)
+POPULARITY_WINDOW = timedelta(
+    days=int(os.getenv('POPULARITY_WINDOW_DAYS', 14)),
+)
+POPULARITY_REFRESH_INTERVAL = int(
+    os.getenv('POPULARITY_REFRESH_INTERVAL', 15 * 60),
+)
+
+IMAGE_UPLOAD_MAX_SIZE = int(
+    os.getenv('IMAGE_UPLOAD_MAX_SIZE', 10 * 1024 * 1024),
+)
+
+IMAGE_RENDITIONS = {
+    'thumbnail': (160, 160),
+    'card': (480, 480),
+    'detail': (1200, 1200),
+}
+IMAGE_RENDITION_FORMAT = os.getenv('IMAGE_RENDITION_FORMAT', 'WEBP')
+IMAGE_RENDITION_QUALITY = 80
+IMAGE_RENDITION_WORKERS = int(os.getenv('IMAGE_RENDITION_WORKERS', 2))
+
+AUTH_TOKEN_CACHE_TIMEOUT = int(os.getenv('AUTH_TOKEN_CACHE_TIMEOUT', 5 * 60))
+
 DJOSER = {
     'LOGIN_FIELD': 'email',
     'HIDE_USERS': False,
@@ -148,6 +255,11 @@ ERROR_MESSAGES = {
     'empty_tags': 'Ошибка ввода данных: поле тегов не может быть пустым.',
     'repeat_ingredients': 'Ошибка ввода данных: ингредиенты не должны повторяться.',
     'repeat_tags': 'Ошибка ввода данных: теги не должны повторяться.',
+    'missing_ingredients': 'Ошибка ввода данных: ингредиенты не найдены: {ids}.',
+    'missing_tags': 'Ошибка ввода данных: теги не найдены: {ids}.',
     'subscribe_self': 'Нельзя подписаться на самого себя',
     'no_ingredients': 'Ошибка ввода данных: поле ингредиентов обязательно для заполнения.',
+    'shopping_cart_exists': 'Рецепт уже добавлен в список покупок',
+    'favorite_exists': 'Рецепт уже добавлен в избранное',
+    'cursor_ordering': 'Курсорная пагинация доступна только для сортировки по -id и -favorites_count',
 }
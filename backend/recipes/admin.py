@@ -17,13 +17,11 @@ class IngredientAdmin(admin.ModelAdmin):
 
 @admin.register(Recipe)
 class RecipeAdmin(admin.ModelAdmin):
-    list_display = ('name', 'author', 'favorite_count')
+    list_display = ('name', 'author', 'favorites_count')
+    list_select_related = ('author',)
     search_fields = ('name', 'author__username')
     list_filter = ('tags',)
-
-    def favorite_count(self, obj):
-        return obj.favorites.count()
-    favorite_count.short_description = 'Количество добавлений в избранное'
+    readonly_fields = ('favorites_count', 'shopping_carts_count')
 
 
 admin.site.empty_value_display = 'Не задано'
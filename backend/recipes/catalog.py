@@ -0,0 +1,133 @@
+import csv
+import hashlib
+import json
+from collections import namedtuple
+from itertools import islice
+
+from django.db import connection, transaction
+from django.db.models import F
+from psycopg2.extras import execute_values
+
+from .models import CatalogImport, Ingredient, Tag
+
+CHUNK_SIZE = 64 * 1024
+
+Catalog = namedtuple('Catalog', ('model', 'key', 'update'))
+ImportResult = namedtuple('ImportResult', ('rows', 'inserted', 'updated'))
+
+CATALOGS = {
+    'ingredients': Catalog(Ingredient, ('name', 'measurement_unit'), ()),
+    'tags': Catalog(Tag, ('slug',), ('name',)),
+}
+
+
+def get_catalog_version(source):
+    return (
+        CatalogImport.objects.filter(source=source)
+        .values_list('version', flat=True)
+        .first()
+    ) or 0
+
+
+def bump_catalog_version(source):
+    if not CatalogImport.objects.filter(source=source).update(
+        version=F('version') + 1,
+    ):
+        CatalogImport.objects.get_or_create(
+            source=source,
+            defaults={'version': 1},
+        )
+
+
+def get_checksum(path):
+    digest = hashlib.sha256()
+    with open(path, 'rb') as file:
+        for chunk in iter(lambda: file.read(CHUNK_SIZE), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def read_rows(path, model, fields):
+    if path.suffix == '.json':
+        with open(path, encoding='utf-8') as file:
+            items = json.load(file)
+        for item in items:
+            if 'model' in item:
+                if item['model'] != model._meta.label_lower:
+                    continue
+                item = item['fields']
+            yield tuple(str(item[field]).strip() for field in fields)
+        return
+    with open(path, encoding='utf-8', newline='') as file:
+        for item in csv.DictReader(file):
+            yield tuple(item[field].strip() for field in fields)
+
+
+def get_upsert_sql(catalog):
+    quote = connection.ops.quote_name
+    meta = catalog.model._meta
+    table = quote(meta.db_table)
+    columns = [
+        quote(meta.get_field(field).column)
+        for field in catalog.key + catalog.update
+    ]
+    key = ', '.join(columns[:len(catalog.key)])
+    sql = f'INSERT INTO {table} ({", ".join(columns)}) VALUES %s '
+    if not catalog.update:
+        return sql + f'ON CONFLICT ({key}) DO NOTHING RETURNING TRUE'
+    update = columns[len(catalog.key):]
+    assignments = ', '.join(
+        f'{column} = EXCLUDED.{column}' for column in update
+    )
+    current = ', '.join(f'{table}.{column}' for column in update)
+    excluded = ', '.join(f'EXCLUDED.{column}' for column in update)
+    return sql + (
+        f'ON CONFLICT ({key}) DO UPDATE SET {assignments} '
+        f'WHERE ({current}) IS DISTINCT FROM ({excluded}) '
+        'RETURNING xmax = 0'
+    )
+
+
+def upsert(catalog, rows, batch_size):
+    sql = get_upsert_sql(catalog)
+    key_size = len(catalog.key)
+    total = inserted = updated = 0
+    with connection.cursor() as cursor:
+        while True:
+            batch = list(islice(rows, batch_size))
+            if not batch:
+                break
+            total += len(batch)
+            unique = {row[:key_size]: row for row in batch}
+            for (created,) in execute_values(
+                cursor.cursor,
+                sql,
+                list(unique.values()),
+                page_size=len(unique),
+                fetch=True,
+            ):
+                if created:
+                    inserted += 1
+                else:
+                    updated += 1
+    return ImportResult(total, inserted, updated)
+
+
+def import_catalog(source, path, batch_size, force=False):
+    catalog = CATALOGS[source]
+    checksum = get_checksum(path)
+    if not force and CatalogImport.objects.filter(
+        source=source,
+        checksum=checksum,
+    ).exists():
+        return None
+    rows = read_rows(path, catalog.model, catalog.key + catalog.update)
+    with transaction.atomic():
+        result = upsert(catalog, rows, batch_size)
+        CatalogImport.objects.update_or_create(
+            source=source,
+            defaults={'checksum': checksum, 'rows': result.rows},
+        )
+        if result.inserted or result.updated:
+            bump_catalog_version(source)
+    return result
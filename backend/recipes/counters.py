@@ -0,0 +1,57 @@
+from django.contrib.auth import get_user_model
+from django.db.models import Count, F, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+
+from .models import Favorite, Recipe, ShoppingCart, Subscription
+
+User = get_user_model()
+
+COUNTERS = (
+    (Favorite, 'recipe_id', Recipe, 'favorites_count'),
+    (ShoppingCart, 'recipe_id', Recipe, 'shopping_carts_count'),
+    (Recipe, 'author_id', User, 'recipes_count'),
+    (Subscription, 'author_id', User, 'subscribers_count'),
+)
+
+
+def update_counter(queryset, field, delta):
+    if delta < 0:
+        queryset = queryset.filter(**{f'{field}__gte': -delta})
+    return queryset.update(**{field: F(field) + delta})
+
+
+def change_counter(model, pk, field, delta):
+    return update_counter(model.objects.filter(pk=pk), field, delta)
+
+
+def change_counters(model, pks, field, delta):
+    return update_counter(
+        model.objects.filter(
+            pk__in=model.objects.filter(pk__in=pks)
+            .order_by('pk')
+            .select_for_update()
+            .values('pk'),
+        ),
+        field,
+        delta,
+    )
+
+
+def reconcile_counter(source, foreign_key, target, field, pks=None):
+    actual = Coalesce(
+        Subquery(
+            source.objects.filter(**{foreign_key: OuterRef('pk')})
+            .values(foreign_key)
+            .annotate(total=Count('pk'))
+            .values('total'),
+        ),
+        0,
+    )
+    queryset = target.objects.all()
+    if pks is not None:
+        queryset = queryset.filter(pk__in=pks)
+    return (
+        queryset.annotate(actual=actual)
+        .exclude(**{field: F('actual')})
+        .update(**{field: actual})
+    )
@@ -0,0 +1,335 @@
+import base64
+import heapq
+import itertools
+import random
+from collections import Counter, namedtuple
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.contrib.auth.hashers import make_password
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from django.db import connection, transaction
+from django.utils import timezone
+from psycopg2.extras import execute_values
+
+from .models import (
+    AmountOfIngredientInRecipe,
+    Favorite,
+    Ingredient,
+    Recipe,
+    ShoppingCart,
+    Subscription,
+    Tag,
+    TagInRecipe,
+)
+
+User = get_user_model()
+
+USERNAME_PREFIX = 'synthetic_'
+PASSWORD = 'synthetic-password'
+IMAGE_NAME = 'recipes/images/synthetic.png'
+IMAGE = base64.b64decode(
+    'iVBORw0KGgoAAAANSUhEUgAAAAEAAAABCAYAAAAfFcSJAAAADUlEQVR42mNk+M9QDwAD'
+    'hgGAWjR9awAAAABJRU5ErkJggg==',
+)
+BATCH_SIZE = 1000
+DEFAULT_TAGS = 6
+DEFAULT_INGREDIENTS = 500
+TAGS_PER_RECIPE = (1, 3)
+INGREDIENTS_PER_RECIPE = (3, 12)
+POPULAR_DRAWS = 4
+COOKING_TIME = (5, 180)
+WORDS = (
+    'суп', 'салат', 'пирог', 'соус', 'каша', 'запеканка', 'рагу', 'блины',
+    'котлеты', 'паста', 'омлет', 'плов', 'борщ', 'жаркое', 'гратен',
+    'томатный', 'сливочный', 'острый', 'домашний', 'быстрый', 'летний',
+    'грибной', 'куриный', 'овощной', 'сырный', 'пряный', 'нежный',
+)
+
+Dataset = namedtuple(
+    'Dataset',
+    (
+        'users',
+        'recipes',
+        'tags',
+        'ingredients',
+        'favorites',
+        'shopping_carts',
+        'subscriptions',
+    ),
+)
+
+
+def get_count(rng, average):
+    if average <= 0:
+        return 0
+    return round(rng.expovariate(1 / average))
+
+
+def get_words(rng, count):
+    return ' '.join(rng.choices(WORDS, k=count))
+
+
+def get_popularity_weights(size):
+    return list(itertools.accumulate(1 / rank for rank in range(1, size + 1)))
+
+
+def pick_popular(rng, items, weights, count, exclude=None):
+    count = min(count, len(items) - (exclude is not None))
+    if count <= 0:
+        return []
+    picked = {}
+    draws = rng.choices(items, cum_weights=weights, k=count * POPULAR_DRAWS)
+    for item in draws:
+        if item != exclude:
+            picked[item] = None
+            if len(picked) == count:
+                return list(picked)
+    keys = (
+        (rng.random() ** (1 / (weight - previous)), item)
+        for item, weight, previous in zip(items, weights, [0, *weights])
+        if item != exclude and item not in picked
+    )
+    picked.update(
+        (item, None)
+        for _, item in heapq.nlargest(count - len(picked), keys)
+    )
+    return list(picked)
+
+
+def plan_links(rng, owners, targets, average, allow_self=True):
+    ranking = list(range(targets))
+    rng.shuffle(ranking)
+    weights = get_popularity_weights(targets)
+    return [
+        (owner, target)
+        for owner in range(owners)
+        for target in pick_popular(
+            rng,
+            ranking,
+            weights,
+            get_count(rng, average),
+            exclude=None if allow_self else owner,
+        )
+    ]
+
+
+def count_targets(links):
+    return Counter(target for _, target in links)
+
+
+def get_image():
+    if not default_storage.exists(IMAGE_NAME):
+        default_storage.save(IMAGE_NAME, ContentFile(IMAGE))
+    return IMAGE_NAME
+
+
+def ensure_catalog():
+    if not Tag.objects.exists():
+        Tag.objects.bulk_create(
+            Tag(name=f'Тег {number}', slug=f'tag_{number}')
+            for number in range(DEFAULT_TAGS)
+        )
+    if not Ingredient.objects.exists():
+        Ingredient.objects.bulk_create(
+            (
+                Ingredient(name=f'ингредиент {number}', measurement_unit='г')
+                for number in range(DEFAULT_INGREDIENTS)
+            ),
+            batch_size=BATCH_SIZE,
+        )
+    return (
+        list(Tag.objects.order_by('pk').values_list('pk', flat=True)),
+        list(Ingredient.objects.order_by('pk').values_list('pk', flat=True)),
+    )
+
+
+def create_users(rng, count, prefix, recipe_authors, subscriptions):
+    password = make_password(PASSWORD)
+    recipes_count = Counter(recipe_authors)
+    subscribers_count = count_targets(subscriptions)
+    return [
+        user.pk
+        for user in User.objects.bulk_create(
+            (
+                User(
+                    username=f'{prefix}{number}',
+                    email=f'{prefix}{number}@example.com',
+                    first_name=get_words(rng, 1).capitalize(),
+                    last_name=get_words(rng, 1).capitalize(),
+                    password=password,
+                    recipes_count=recipes_count[number],
+                    subscribers_count=subscribers_count[number],
+                )
+                for number in range(count)
+            ),
+            batch_size=BATCH_SIZE,
+        )
+    ]
+
+
+def create_recipes(rng, user_ids, recipe_authors, favorites,
+                   shopping_carts):
+    image = get_image()
+    favorites_count = count_targets(favorites)
+    shopping_carts_count = count_targets(shopping_carts)
+    return [
+        recipe.pk
+        for recipe in Recipe.objects.bulk_create(
+            (
+                Recipe(
+                    author_id=user_ids[author],
+                    name=get_words(rng, rng.randint(2, 4)).capitalize(),
+                    text=get_words(rng, rng.randint(20, 60)),
+                    cooking_time=rng.randint(*COOKING_TIME),
+                    image=image,
+                    favorites_count=favorites_count[number],
+                    shopping_carts_count=shopping_carts_count[number],
+                )
+                for number, author in enumerate(recipe_authors)
+            ),
+            batch_size=BATCH_SIZE,
+        )
+    ]
+
+
+def insert_rows(model, fields, rows):
+    quote = connection.ops.quote_name
+    meta = model._meta
+    columns = ', '.join(
+        quote(meta.get_field(field).column) for field in fields
+    )
+    with connection.cursor() as cursor:
+        execute_values(
+            cursor.cursor,
+            f'INSERT INTO {quote(meta.db_table)} ({columns}) VALUES %s',
+            rows,
+            page_size=BATCH_SIZE,
+        )
+    return len(rows)
+
+
+def create_recipe_relations(rng, recipe_ids, tag_ids, ingredient_ids):
+    weights = get_popularity_weights(len(ingredient_ids))
+    tags = []
+    ingredients = []
+    for recipe_id in recipe_ids:
+        tags.extend(
+            (recipe_id, tag_id)
+            for tag_id in rng.sample(
+                tag_ids,
+                min(rng.randint(*TAGS_PER_RECIPE), len(tag_ids)),
+            )
+        )
+        ingredients.extend(
+            (recipe_id, ingredient_id, rng.randint(1, 50) * 10)
+            for ingredient_id in pick_popular(
+                rng,
+                ingredient_ids,
+                weights,
+                rng.randint(*INGREDIENTS_PER_RECIPE),
+            )
+        )
+    insert_rows(TagInRecipe, ('recipe', 'tag'), tags)
+    insert_rows(
+        AmountOfIngredientInRecipe,
+        ('recipe', 'ingredient', 'amount'),
+        ingredients,
+    )
+
+
+def create_links(model, fields, links, owner_ids, target_ids):
+    return insert_rows(
+        model,
+        fields,
+        [(owner_ids[owner], target_ids[target]) for owner, target in links],
+    )
+
+
+def create_timed_links(rng, model, links, owner_ids, target_ids):
+    now = timezone.now()
+    window = settings.POPULARITY_WINDOW
+    return insert_rows(
+        model,
+        ('customer', 'recipe', 'created'),
+        [
+            (owner_ids[owner], target_ids[target], now - window * rng.random())
+            for owner, target in links
+        ],
+    )
+
+
+def generate(users, recipes=5, favorites=10, shopping_carts=3,
+             subscriptions=5, seed=0, prefix=USERNAME_PREFIX):
+    rng = random.Random(seed)
+    recipe_authors = [
+        author
+        for author in range(users)
+        for _ in range(get_count(rng, recipes))
+    ]
+    favorites = plan_links(rng, users, len(recipe_authors), favorites)
+    shopping_carts = plan_links(
+        rng,
+        users,
+        len(recipe_authors),
+        shopping_carts,
+    )
+    subscriptions = plan_links(
+        rng,
+        users,
+        users,
+        subscriptions,
+        allow_self=False,
+    )
+    return create_dataset(
+        rng,
+        users,
+        recipe_authors,
+        favorites,
+        shopping_carts,
+        subscriptions,
+        prefix,
+    )
+
+
+def create_dataset(rng, users, recipe_authors, favorites, shopping_carts,
+                   subscriptions, prefix=USERNAME_PREFIX):
+    with transaction.atomic():
+        tag_ids, ingredient_ids = ensure_catalog()
+        user_ids = create_users(
+            rng,
+            users,
+            prefix,
+            recipe_authors,
+            subscriptions,
+        )
+        recipe_ids = create_recipes(
+            rng,
+            user_ids,
+            recipe_authors,
+            favorites,
+            shopping_carts,
+        )
+        create_recipe_relations(rng, recipe_ids, tag_ids, ingredient_ids)
+        dataset = Dataset(
+            users=len(user_ids),
+            recipes=len(recipe_ids),
+            tags=len(tag_ids),
+            ingredients=len(ingredient_ids),
+            favorites=create_timed_links(
+                rng, Favorite, favorites, user_ids, recipe_ids,
+            ),
+            shopping_carts=create_timed_links(
+                rng, ShoppingCart, shopping_carts, user_ids, recipe_ids,
+            ),
+            subscriptions=create_links(
+                Subscription,
+                ('subscriber', 'author'),
+                subscriptions,
+                user_ids,
+                user_ids,
+            ),
+        )
+        Recipe.objects.filter(pk__in=recipe_ids).update_search_vector()
+    return dataset
@@ -0,0 +1,17 @@
+from django.core.management.base import BaseCommand
+
+from recipes.counters import COUNTERS, reconcile_counter
+
+
+class Command(BaseCommand):
+    help = 'Пересчитывает счётчики избранного, корзин, рецептов и подписок'
+
+    def handle(self, *args, **options):
+        for counter in COUNTERS:
+            _, _, target, field = counter
+            updated = reconcile_counter(*counter)
+            self.stdout.write(
+                f'{target._meta.model_name}.{field}: '
+                f'исправлено записей — {updated}',
+            )
+        self.stdout.write(self.style.SUCCESS('Счётчики пересчитаны'))
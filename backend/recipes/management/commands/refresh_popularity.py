@@ -0,0 +1,43 @@
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.db import DatabaseError, connection
+
+from recipes.popularity import refresh_popularity
+
+
+class Command(BaseCommand):
+    help = 'Пересчитывает популярность рецептов за последний период'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--loop',
+            action='store_true',
+            help=(
+                'Не завершаться и пересчитывать популярность каждые '
+                'POPULARITY_REFRESH_INTERVAL секунд'
+            ),
+        )
+
+    def handle(self, *args, **options):
+        if not options['loop']:
+            self.refresh()
+            return
+        while True:
+            try:
+                self.refresh()
+            except DatabaseError as error:
+                self.stderr.write(
+                    f'Не удалось пересчитать популярность: {error}',
+                )
+                connection.close()
+            time.sleep(settings.POPULARITY_REFRESH_INTERVAL)
+
+    def refresh(self):
+        updated, expired = refresh_popularity()
+        self.stdout.write(
+            self.style.SUCCESS(
+                f'Обновлено рецептов: {updated}, обнулено: {expired}',
+            ),
+        )
@@ -0,0 +1,55 @@
+# Generated by Django 3.2.16 on 2026-10-16 23:24
+
+from django.db import migrations, models
+from django.db.models import Count, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+
+
+def fill_counters(apps, schema_editor):
+    Recipe = apps.get_model('recipes', 'Recipe')
+    User = apps.get_model('users', 'CustomUser')
+    counters = (
+        ('Favorite', 'recipe_id', Recipe, 'favorites_count'),
+        ('ShoppingCart', 'recipe_id', Recipe, 'shopping_carts_count'),
+        ('Recipe', 'author_id', User, 'recipes_count'),
+        ('Subscription', 'author_id', User, 'subscribers_count'),
+    )
+    for source, foreign_key, target, field in counters:
+        source = apps.get_model('recipes', source)
+        target.objects.update(**{
+            field: Coalesce(
+                Subquery(
+                    source.objects.filter(**{foreign_key: OuterRef('pk')})
+                    .values(foreign_key)
+                    .annotate(total=Count('pk'))
+                    .values('total'),
+                ),
+                0,
+            ),
+        })
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('recipes', '0009_add_recipe_search_vector'),
+        ('users', '0003_add_counters'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='recipe',
+            name='favorites_count',
+            field=models.PositiveIntegerField(default=0, editable=False, verbose_name='Количество добавлений в избранное'),
+        ),
+        migrations.AddField(
+            model_name='recipe',
+            name='shopping_carts_count',
+            field=models.PositiveIntegerField(default=0, editable=False, verbose_name='Количество добавлений в корзину'),
+        ),
+        migrations.AddIndex(
+            model_name='recipe',
+            index=models.Index(fields=['-favorites_count', '-id'], name='recipe_favorites_count_idx'),
+        ),
+        migrations.RunPython(fill_counters, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 3.2.16 on 2026-10-17 00:08
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('recipes', '0012_add_catalog_import'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='catalogimport',
+            name='version',
+            field=models.PositiveBigIntegerField(default=0, verbose_name='Версия данных'),
+        ),
+    ]
@@ -1,6 +1,28 @@
+from django.conf import settings
 from django.contrib.auth import get_user_model
+from django.contrib.postgres.aggregates import StringAgg
+from django.contrib.postgres.indexes import GinIndex
+from django.contrib.postgres.search import (
+    SearchQuery,
+    SearchRank,
+    SearchVector,
+    SearchVectorField,
+    TrigramSimilarity,
+)
 from django.core.validators import MinValueValidator
 from django.db import models
+from django.db.models import (
+    BooleanField,
+    Exists,
+    F,
+    OuterRef,
+    Prefetch,
+    Q,
+    Subquery,
+    Value,
+)
+
+from users.counters import CounterFieldsMixin
 
 User = get_user_model()
 
@@ -49,6 +71,12 @@ class Ingredient(models.Model):
         default_related_name = 'ingredients'
         verbose_name = 'ингредиент'
         verbose_name_plural = 'Ингредиенты'
+        constraints = [
+            models.UniqueConstraint(
+                fields=['name', 'measurement_unit'],
+                name='unique_ingredient_name_unit',
+            ),
+        ]
 
     def __str__(self):
         return self.name
@@ -87,7 +115,65 @@ class AmountOfIngredientInRecipe(models.Model):
         return f'{self.ingredient} {self.amount}'
 
 
-class Recipe(models.Model):
+class RecipeQuerySet(models.QuerySet):
+    def with_user_flags(self, user):
+        if not user.is_authenticated:
+            return self.annotate(
+                author_is_subscribed=Value(False, output_field=BooleanField()),
+            )
+        return self.annotate(
+            author_is_subscribed=Exists(
+                Subscription.objects.filter(
+                    subscriber=user,
+                    author=OuterRef('author'),
+                ),
+            ),
+        )
+
+    def update_search_vector(self):
+        config = settings.RECIPE_SEARCH_CONFIG
+        ingredient_names = (
+            AmountOfIngredientInRecipe.objects.filter(recipe=OuterRef('pk'))
+            .values('recipe')
+            .annotate(names=StringAgg('ingredient__name', ' '))
+            .values('names')
+        )
+        return self.update(
+            search_vector=(
+                SearchVector('name', weight='A', config=config)
+                + SearchVector('text', weight='B', config=config)
+                + SearchVector(
+                    Subquery(ingredient_names),
+                    weight='C',
+                    config=config,
+                )
+            ),
+        )
+
+    def search(self, text):
+        query = SearchQuery(text, config=settings.RECIPE_SEARCH_CONFIG)
+        return self.annotate(
+            rank=SearchRank(F('search_vector'), query),
+            similarity=TrigramSimilarity('name', text),
+        ).filter(Q(search_vector=query) | Q(name__trigram_similar=text))
+
+    def for_retrieve(self, user):
+        return (
+            self.with_user_flags(user)
+            .select_related('author')
+            .prefetch_related(
+                Prefetch('tags', queryset=Tag.objects.all()),
+                Prefetch(
+                    'amount_of_ingredient',
+                    queryset=AmountOfIngredientInRecipe.objects.select_related(
+                        'ingredient',
+                    ),
+                ),
+            )
+        )
+
+
+class Recipe(CounterFieldsMixin, models.Model):
     tags = models.ManyToManyField(
         Tag,
         verbose_name='Теги',
@@ -112,16 +198,82 @@ class Recipe(models.Model):
             MinValueValidator(limit_value=1),
         ],
     )
+    favorites_count = models.PositiveIntegerField(
+        'Количество добавлений в избранное',
+        default=0,
+        editable=False,
+    )
+    shopping_carts_count = models.PositiveIntegerField(
+        'Количество добавлений в корзину',
+        default=0,
+        editable=False,
+    )
+    popularity = models.FloatField(
+        'Популярность',
+        default=0,
+        editable=False,
+    )
+    search_vector = SearchVectorField(null=True, editable=False)
+
+    counter_fields = (
+        'favorites_count',
+        'shopping_carts_count',
+        'popularity',
+        'search_vector',
+    )
+    objects = RecipeQuerySet.as_manager()
 
     class Meta:
         default_related_name = 'recipes'
         verbose_name = 'рецепт'
         verbose_name_plural = 'Рецепты'
+        indexes = [
+            GinIndex(
+                fields=['search_vector'],
+                name='recipe_search_vector_idx',
+            ),
+            GinIndex(
+                fields=['name'],
+                name='recipe_name_trgm_idx',
+                opclasses=['gin_trgm_ops'],
+            ),
+            models.Index(
+                fields=['-favorites_count', '-id'],
+                name='recipe_favorites_count_idx',
+            ),
+            models.Index(
+                fields=['-popularity', '-id'],
+                name='recipe_popularity_idx',
+            ),
+        ]
 
     def __str__(self):
         return self.name
 
 
+class SubscriptionQuerySet(models.QuerySet):
+    def for_feed(self, recipes_limit=None):
+        recipes = Recipe.objects.order_by('-id')
+        if recipes_limit is not None:
+            recipes = recipes.filter(
+                pk__in=Subquery(
+                    Recipe.objects.filter(author=OuterRef('author'))
+                    .order_by('-id')
+                    .values('pk')[:recipes_limit],
+                ),
+            )
+        return (
+            self.select_related('author')
+            .prefetch_related(
+                Prefetch(
+                    'author__recipes',
+                    queryset=recipes,
+                    to_attr='preview_recipes',
+                ),
+            )
+        )
+
+
 class Subscription(models.Model):
     author = models.ForeignKey(
         User,
@@ -136,6 +288,8 @@ class Subscription(models.Model):
         related_name='subscribers',
     )
 
+    objects = SubscriptionQuerySet.as_manager()
+
     class Meta:
         default_related_name = 'subscriptions'
         verbose_name = 'подписка'
@@ -162,6 +316,11 @@ class ShoppingCartFavoriteBaseModel(models.Model):
         on_delete=models.CASCADE,
         verbose_name='Рецепт',
     )
+    created = models.DateTimeField(
+        'Дата добавления',
+        auto_now_add=True,
+        db_index=True,
+    )
 
     class Meta:
         abstract = True
@@ -194,3 +353,18 @@ class Favorite(ShoppingCartFavoriteBaseModel):
                 name='unique_customer_recipe_in_favorite',
             ),
         ]
+
+
+class CatalogImport(models.Model):
+    source = models.CharField('Справочник', max_length=32, unique=True)
+    checksum = models.CharField('Контрольная сумма', max_length=64)
+    rows = models.PositiveIntegerField('Количество строк', default=0)
+    imported = models.DateTimeField('Дата импорта', auto_now=True)
+    version = models.PositiveBigIntegerField('Версия данных', default=0)
+
+    class Meta:
+        verbose_name = 'импорт справочника'
+        verbose_name_plural = 'Импорт справочников'
+
+    def __str__(self):
+        return self.source
@@ -0,0 +1,49 @@
+import math
+
+from django.conf import settings
+from django.db.models import Exists, OuterRef, Sum, Value
+from django.db.models.functions import Exp, Extract
+from django.utils import timezone
+
+from .models import Favorite, Recipe, ShoppingCart
+
+WEIGHTS = (
+    (Favorite, 1.0),
+    (ShoppingCart, 0.5),
+)
+
+
+def get_recent_scores(source, weight, now, since):
+    decay = -math.log(2) / settings.POPULARITY_HALF_LIFE.total_seconds()
+    age = Value(now.timestamp()) - Extract('created', 'epoch')
+    return (
+        source.objects.filter(created__gte=since)
+        .values_list('recipe_id')
+        .annotate(score=Sum(Exp(age * decay) * weight))
+        .iterator()
+    )
+
+
+def refresh_popularity(now=None):
+    now = now or timezone.now()
+    since = now - settings.POPULARITY_WINDOW
+    scores = {}
+    for source, weight in WEIGHTS:
+        for recipe_id, score in get_recent_scores(source, weight, now, since):
+            scores[recipe_id] = scores.get(recipe_id, 0) + score
+    Recipe.objects.bulk_update(
+        [Recipe(pk=pk, popularity=score) for pk, score in scores.items()],
+        ('popularity',),
+        batch_size=1000,
+    )
+    expired = Recipe.objects.filter(popularity__gt=0)
+    for source, _ in WEIGHTS:
+        expired = expired.exclude(
+            Exists(
+                source.objects.filter(
+                    recipe=OuterRef('pk'),
+                    created__gte=since,
+                ),
+            ),
+        )
+    return len(scores), expired.update(popularity=0)
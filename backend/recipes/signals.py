@@ -0,0 +1,53 @@
+from django.db.models.signals import post_delete, post_save, pre_delete
+from django.dispatch import Signal
+
+from users.counters import defer_decrement, mark_deleting
+from .counters import (
+    COUNTERS,
+    change_counter,
+    change_counters,
+    reconcile_counter,
+)
+
+relations_changed = Signal()
+
+
+def connect_counter(source, foreign_key, target, field):
+    def increment(sender, instance, created, **kwargs):
+        if created:
+            change_counter(target, getattr(instance, foreign_key), field, 1)
+
+    def reconcile_targets(target_ids):
+        reconcile_counter(source, foreign_key, target, field, target_ids)
+
+    def decrement(sender, instance, **kwargs):
+        pk = getattr(instance, foreign_key)
+        if not defer_decrement(reconcile_targets, target, pk):
+            change_counter(target, pk, field, -1)
+
+    def change(sender, target_ids, delta, **kwargs):
+        if target_ids:
+            change_counters(target, target_ids, field, delta)
+
+    def mark_target(sender, instance, **kwargs):
+        mark_deleting(target, instance.pk)
+
+    uid = f'{source.__name__}.{field}'
+    post_save.connect(increment, sender=source, weak=False, dispatch_uid=uid)
+    post_delete.connect(decrement, sender=source, weak=False, dispatch_uid=uid)
+    relations_changed.connect(
+        change,
+        sender=source,
+        weak=False,
+        dispatch_uid=uid,
+    )
+    pre_delete.connect(
+        mark_target,
+        sender=target,
+        weak=False,
+        dispatch_uid=f'{target.__name__}.deleting',
+    )
+
+
+for counter in COUNTERS:
+    connect_counter(*counter)
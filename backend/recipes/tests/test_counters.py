@@ -0,0 +1,121 @@
+from django.contrib.auth import get_user_model
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+
+from ..models import Favorite, Recipe, ShoppingCart, Subscription
+
+User = get_user_model()
+
+
+class CounterSaveTest(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.author, cls.reader = (
+            User.objects.create_user(
+                username=username,
+                email=f'{username}@example.com',
+                first_name='Имя',
+                last_name='Фамилия',
+            )
+            for username in ('author', 'reader')
+        )
+        cls.recipe = Recipe.objects.create(
+            author=cls.author,
+            name='Рецепт',
+            text='Текст',
+            cooking_time=10,
+            image='recipes/images/test.png',
+        )
+
+    def test_recipe_save_keeps_counters(self):
+        stale = Recipe.objects.get(pk=self.recipe.pk)
+        Favorite.objects.create(customer=self.reader, recipe=self.recipe)
+        stale.name = 'Новое название'
+        stale.save()
+        recipe = Recipe.objects.get(pk=self.recipe.pk)
+        self.assertEqual(recipe.name, 'Новое название')
+        self.assertEqual(recipe.favorites_count, 1)
+
+    def test_user_save_keeps_counters(self):
+        stale = User.objects.get(pk=self.author.pk)
+        Subscription.objects.create(subscriber=self.reader, author=self.author)
+        stale.first_name = 'Другое'
+        stale.save()
+        author = User.objects.get(pk=self.author.pk)
+        self.assertEqual(author.first_name, 'Другое')
+        self.assertEqual(author.subscribers_count, 1)
+        self.assertEqual(author.recipes_count, 1)
+
+
+class CounterCascadeTest(TestCase):
+    def create_user(self, username):
+        return User.objects.create_user(
+            username=username,
+            email=f'{username}@example.com',
+            first_name='Имя',
+            last_name='Фамилия',
+        )
+
+    def create_recipes(self, author, count):
+        return [
+            Recipe.objects.create(
+                author=author,
+                name=f'Рецепт {number}',
+                text='Текст',
+                cooking_time=10,
+                image='recipes/images/test.png',
+            )
+            for number in range(count)
+        ]
+
+    def create_user_with_relations(self, username, size):
+        user = self.create_user(username)
+        own = self.create_recipes(user, size)
+        others = self.create_recipes(self.create_user(f'{username}_a'), size)
+        readers = [
+            self.create_user(f'{username}_r{number}')
+            for number in range(size)
+        ]
+        for recipe in others:
+            Favorite.objects.create(customer=user, recipe=recipe)
+            ShoppingCart.objects.create(customer=user, recipe=recipe)
+        for reader, recipe in zip(readers, own):
+            Favorite.objects.create(customer=reader, recipe=recipe)
+            Subscription.objects.create(subscriber=user, author=reader)
+            Subscription.objects.create(subscriber=reader, author=user)
+        return user, others, readers
+
+    def test_user_delete(self):
+        user, others, readers = self.create_user_with_relations('user', 3)
+        user.delete()
+        for recipe in Recipe.objects.filter(pk__in=[r.pk for r in others]):
+            self.assertEqual(recipe.favorites_count, 0)
+            self.assertEqual(recipe.shopping_carts_count, 0)
+        for reader in User.objects.filter(pk__in=[r.pk for r in readers]):
+            self.assertEqual(reader.subscribers_count, 0)
+        self.assertEqual(
+            User.objects.get(pk=others[0].author_id).recipes_count,
+            3,
+        )
+
+    def test_recipe_delete(self):
+        author = self.create_user('author')
+        recipe, kept = self.create_recipes(author, 2)
+        Favorite.objects.create(customer=author, recipe=recipe)
+        Recipe.objects.get(pk=recipe.pk).delete()
+        author.refresh_from_db()
+        self.assertEqual(author.recipes_count, 1)
+
+    def get_delete_queries(self, user):
+        with CaptureQueriesContext(connection) as queries:
+            user.delete()
+        return len(queries)
+
+    def test_user_delete_queries_do_not_grow(self):
+        small, _, _ = self.create_user_with_relations('small', 2)
+        large, _, _ = self.create_user_with_relations('large', 8)
+        self.assertEqual(
+            self.get_delete_queries(large),
+            self.get_delete_queries(small),
+        )
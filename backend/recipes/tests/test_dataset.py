@@ -0,0 +1,52 @@
+import random
+from collections import Counter
+
+from django.test import SimpleTestCase
+
+from ..dataset import get_popularity_weights, pick_popular
+
+ITEMS = 1000
+TRIALS = 2000
+
+
+class PickPopularTest(SimpleTestCase):
+    def setUp(self):
+        self.rng = random.Random(0)
+        self.items = list(range(ITEMS))
+        self.weights = get_popularity_weights(ITEMS)
+
+    def pick(self, count, exclude=None):
+        picked = pick_popular(
+            self.rng,
+            self.items,
+            self.weights,
+            count,
+            exclude=exclude,
+        )
+        self.assertEqual(len(picked), len(set(picked)))
+        return picked
+
+    def test_every_item(self):
+        for count in (ITEMS - 1, ITEMS, ITEMS * 2):
+            with self.subTest(count=count):
+                self.assertEqual(
+                    sorted(self.pick(count, exclude=0)),
+                    self.items[1:],
+                )
+
+    def test_count(self):
+        for count in (0, 1, 10, ITEMS // 2):
+            with self.subTest(count=count):
+                picked = self.pick(count, exclude=count)
+                self.assertEqual(len(picked), count)
+                self.assertNotIn(count, picked)
+
+    def test_no_items(self):
+        self.assertEqual(pick_popular(self.rng, [], [], 3, exclude=0), [])
+
+    def test_popular_first(self):
+        counts = Counter(
+            item for _ in range(TRIALS) for item in self.pick(3)
+        )
+        self.assertGreater(counts[0], counts[1])
+        self.assertGreater(counts[1], counts[ITEMS // 2])
@@ -0,0 +1,61 @@
+import threading
+from contextlib import contextmanager
+
+from django.db import transaction
+
+local = threading.local()
+
+
+@contextmanager
+def deferred_counters():
+    if getattr(local, 'deleting', None) is not None:
+        yield
+        return
+    local.deleting = set()
+    local.pending = {}
+    try:
+        with transaction.atomic(savepoint=False):
+            yield
+            for reconcile, pks in local.pending.items():
+                reconcile(pks)
+    finally:
+        local.deleting = local.pending = None
+
+
+def mark_deleting(model, pk):
+    deleting = getattr(local, 'deleting', None)
+    if deleting is not None:
+        deleting.add((model, pk))
+
+
+def defer_decrement(reconcile, target, pk):
+    deleting = getattr(local, 'deleting', None)
+    if deleting is None:
+        return False
+    if (target, pk) not in deleting:
+        local.pending.setdefault(reconcile, set()).add(pk)
+    return True
+
+
+class CounterFieldsMixin:
+    counter_fields = ()
+
+    def save(self, *args, **kwargs):
+        if (
+            not self._state.adding
+            and not kwargs.get('force_insert')
+            and kwargs.get('update_fields') is None
+        ):
+            deferred = self.get_deferred_fields()
+            kwargs['update_fields'] = [
+                field.name
+                for field in self._meta.concrete_fields
+                if not field.primary_key
+                and field.name not in self.counter_fields
+                and field.attname not in deferred
+            ]
+        super().save(*args, **kwargs)
+
+    def delete(self, *args, **kwargs):
+        with deferred_counters():
+            return super().delete(*args, **kwargs)
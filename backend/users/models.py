@@ -1,8 +1,10 @@
 from django.contrib.auth.models import AbstractUser
 from django.db import models
 
+from .counters import CounterFieldsMixin
 
-class CustomUser(AbstractUser):
+
+class CustomUser(CounterFieldsMixin, AbstractUser):
     first_name = models.CharField('Имя', max_length=150, blank=False)
     last_name = models.CharField('Фамилия', max_length=150, blank=False)
     email = models.EmailField('Адрес электронной почты', blank=False)
@@ -12,4 +14,15 @@ class CustomUser(AbstractUser):
         null=True,
         default=None,
     )
+    recipes_count = models.PositiveIntegerField(
+        'Количество рецептов',
+        default=0,
+        editable=False,
+    )
+    subscribers_count = models.PositiveIntegerField(
+        'Количество подписчиков',
+        default=0,
+        editable=False,
+    )
+    counter_fields = ('recipes_count', 'subscribers_count')
     REQUIRED_FIELDS = ('email', 'first_name', 'last_name', 'password')
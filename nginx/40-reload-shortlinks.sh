@@ -0,0 +1,14 @@
+#!/bin/sh
+files="/shortlinks/shortlinks.map /shortlinks/shortlinks.deleted"
+interval=${SHORTLINK_RELOAD_INTERVAL:-60}
+
+(
+    last=$(stat -c %Y $files 2>/dev/null)
+    while sleep "$interval"; do
+        current=$(stat -c %Y $files 2>/dev/null)
+        if [ "$current" != "$last" ]; then
+            nginx -s reload
+            last=$current
+        fi
+    done
+) &